@@ -0,0 +1,113 @@
+"""
+Benchmark of the case-insensitive user lookup by email, with and without
+the `ix_user_oauth_email_lower` index added by migration `9e2f6b1c7a40`.
+
+The benchmark runs the statement of `SQLModelUserDatabaseAsync.get_by_email`
+(used by `/auth/token/login/`, registration and OAuth association) against
+an SQLite database with the `user_oauth` schema, populated with a given
+number of users. Password hashing, which dominates the total login time,
+is not included.
+
+Usage:
+
+    python benchmarks/db_email_lookup.py [--users 10000 100000 1000000]
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+SCHEMA = """
+CREATE TABLE user_oauth (
+    id INTEGER NOT NULL,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    is_superuser BOOLEAN NOT NULL,
+    is_verified BOOLEAN NOT NULL,
+    slurm_user VARCHAR,
+    slurm_accounts JSON DEFAULT '[]' NOT NULL,
+    cache_dir VARCHAR,
+    username VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_user_oauth_email ON user_oauth (email);
+"""
+
+INDEXES = """
+CREATE INDEX ix_user_oauth_email_lower ON user_oauth (lower(email));
+"""
+
+GET_BY_EMAIL = """
+SELECT user_oauth.id, user_oauth.email, user_oauth.hashed_password
+FROM user_oauth
+WHERE lower(user_oauth.email) = lower(?)
+"""
+
+
+def populate(conn: sqlite3.Connection, n_users: int):
+    conn.executemany(
+        "INSERT INTO user_oauth "
+        "(id, email, hashed_password, is_active, is_superuser, is_verified) "
+        "VALUES (?, ?, 'x', 1, 0, 0)",
+        ((ind, f"User{ind}@Example.org") for ind in range(n_users)),
+    )
+    conn.commit()
+
+
+def time_ms(func, repeat: int) -> float:
+    """
+    Return the median duration of `func()`, in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def run(n_users: int, with_indexes: bool) -> dict:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    populate(conn, n_users)
+    if with_indexes:
+        conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+
+    def get_by_email():
+        email = f"user{random.randrange(n_users)}@example.org"
+        if conn.execute(GET_BY_EMAIL, (email,)).fetchone() is None:
+            raise RuntimeError(f"User {email} not found")
+
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN {GET_BY_EMAIL}", ("user0@example.org",)
+    ).fetchall()
+    results = dict(
+        lookup_ms=time_ms(get_by_email, repeat=50),
+        plan=plan[0][-1],
+    )
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--users", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'indexes':>8} {'lookup (ms)':>12}  plan")
+    for n_users in args.users:
+        for with_indexes in (False, True):
+            results = run(n_users, with_indexes)
+            print(
+                f"{n_users:>10} {str(with_indexes):>8} "
+                f"{results['lookup_ms']:>12.3f}  {results['plan']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
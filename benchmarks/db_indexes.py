@@ -0,0 +1,143 @@
+"""
+Benchmark of project listing and creation, with and without the indexes
+added by migration `4c7e1a9b2d3f`.
+
+The benchmark runs the same statements as `GET /api/v1/project/` and
+`POST /api/v1/project/` against an SQLite database with the
+`project`/`linkuserproject` schema, populated with a given number of
+projects evenly distributed among users.
+
+Usage:
+
+    python benchmarks/db_indexes.py [--projects 10000 100000] [--users 100]
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime
+from datetime import timezone
+
+SCHEMA = """
+CREATE TABLE project (
+    name VARCHAR NOT NULL,
+    read_only BOOLEAN NOT NULL,
+    id INTEGER NOT NULL,
+    timestamp_created DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE linkuserproject (
+    project_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (project_id, user_id),
+    FOREIGN KEY(project_id) REFERENCES project (id)
+);
+"""
+
+INDEXES = """
+CREATE INDEX ix_linkuserproject_user_id_project_id
+    ON linkuserproject (user_id, project_id);
+CREATE INDEX ix_project_name ON project (name);
+"""
+
+LIST_PROJECTS = """
+SELECT project.name, project.read_only, project.id, project.timestamp_created
+FROM project JOIN linkuserproject ON project.id = linkuserproject.project_id
+WHERE linkuserproject.user_id = ?
+"""
+
+CHECK_PROJECT_NAME = """
+SELECT project.id
+FROM project JOIN linkuserproject ON project.id = linkuserproject.project_id
+WHERE project.name = ? AND linkuserproject.user_id = ?
+"""
+
+
+def populate(conn: sqlite3.Connection, n_projects: int, n_users: int):
+    timestamp = datetime.now(tz=timezone.utc).isoformat()
+    conn.executemany(
+        "INSERT INTO project (id, name, read_only, timestamp_created) "
+        "VALUES (?, ?, 0, ?)",
+        ((ind, f"project {ind}", timestamp) for ind in range(n_projects)),
+    )
+    conn.executemany(
+        "INSERT INTO linkuserproject (project_id, user_id) VALUES (?, ?)",
+        ((ind, ind % n_users) for ind in range(n_projects)),
+    )
+    conn.commit()
+
+
+def time_ms(func, repeat: int) -> float:
+    """
+    Return the median duration of `func()`, in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def run(n_projects: int, n_users: int, with_indexes: bool) -> dict:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    populate(conn, n_projects, n_users)
+    if with_indexes:
+        conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+
+    user_id = random.randrange(n_users)
+    timestamp = datetime.now(tz=timezone.utc).isoformat()
+    counter = iter(range(n_projects, 2 * n_projects))
+
+    def list_projects():
+        conn.execute(LIST_PROJECTS, (user_id,)).fetchall()
+
+    def create_project():
+        name = f"new project {next(counter)}"
+        if conn.execute(CHECK_PROJECT_NAME, (name, user_id)).fetchall():
+            raise RuntimeError(f"Project name ({name}) already in use")
+        cursor = conn.execute(
+            "INSERT INTO project (name, read_only, timestamp_created) "
+            "VALUES (?, 0, ?)",
+            (name, timestamp),
+        )
+        conn.execute(
+            "INSERT INTO linkuserproject (project_id, user_id) VALUES (?, ?)",
+            (cursor.lastrowid, user_id),
+        )
+        conn.commit()
+
+    results = dict(
+        list_ms=time_ms(list_projects, repeat=50),
+        create_ms=time_ms(create_project, repeat=50),
+    )
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--projects", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    print(
+        f"{'projects':>10} {'indexes':>8} "
+        f"{'list (ms)':>10} {'create (ms)':>12}"
+    )
+    for n_projects in args.projects:
+        for with_indexes in (False, True):
+            results = run(n_projects, args.users, with_indexes)
+            print(
+                f"{n_projects:>10} {str(with_indexes):>8} "
+                f"{results['list_ms']:>10.3f} {results['create_ms']:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark of the memory used to list projects, when reading them as ORM
+instances, as rows of ORM attributes and as rows of table columns.
+
+The benchmark creates an in-memory SQLite database with the `fractal-server`
+models, adds a given number of projects (all belonging to the same user) and
+reads them back with the three kinds of statement:
+
+* `orm`: `select(Project)`, i.e. full instances with their SQLAlchemy state,
+  registered in the identity map of the session;
+* `orm_columns`: `select(Project.id, Project.name, ...)`, which still goes
+  through the ORM loading machinery;
+* `core`: `select(project.c.id, project.c.name, ...)` on table columns, as
+  done by `GET /api/v1/project/` (see `_select_columns`).
+
+For each statement, it reports the memory still allocated after fetching all
+rows (per row) and the peak memory, as measured by `tracemalloc`, and the
+fetch time.
+
+Usage:
+
+    python benchmarks/db_read_memory.py [--projects 100000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from datetime import timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel import Session
+from sqlmodel import SQLModel
+
+from fractal_server.app.models import LinkUserProject
+from fractal_server.app.models import Project
+from fractal_server.app.models import UserOAuth
+from fractal_server.app.routes._sparse_fieldsets import _select_columns
+from fractal_server.app.schemas import ProjectRead
+
+FIELDS = list(ProjectRead.__fields__)
+
+
+def populate(engine, n_projects: int) -> int:
+    timestamp = datetime.now(tz=timezone.utc)
+    with engine.begin() as conn:
+        res = conn.execute(
+            insert(UserOAuth.__table__).values(
+                email="user@example.org", hashed_password="fake"
+            )
+        )
+        user_id = res.inserted_primary_key[0]
+        conn.execute(
+            insert(Project.__table__),
+            [
+                dict(
+                    id=ind,
+                    name=f"project {ind}",
+                    read_only=False,
+                    timestamp_created=timestamp,
+                    version=1,
+                )
+                for ind in range(1, n_projects + 1)
+            ],
+        )
+        conn.execute(
+            insert(LinkUserProject.__table__),
+            [
+                dict(
+                    project_id=ind,
+                    user_id=user_id,
+                    project_name=f"project {ind}",
+                )
+                for ind in range(1, n_projects + 1)
+            ],
+        )
+    return user_id
+
+
+def statements(user_id: int) -> dict:
+    link_table = LinkUserProject.__table__
+    return dict(
+        orm=(
+            select(Project)
+            .join(LinkUserProject)
+            .where(LinkUserProject.user_id == user_id)
+        ),
+        orm_columns=(
+            select(*(getattr(Project, field) for field in FIELDS))
+            .join(LinkUserProject)
+            .where(LinkUserProject.user_id == user_id)
+        ),
+        core=(
+            select(*_select_columns(Project, FIELDS))
+            .join_from(Project.__table__, link_table)
+            .where(link_table.c.user_id == user_id)
+        ),
+    )
+
+
+def measure(engine, statement) -> dict:
+    """
+    Fetch all rows of `statement` with a new session, and measure the memory
+    still allocated afterwards (while rows and session are alive), the peak
+    memory and the duration.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with Session(engine) as session:
+        rows = session.execute(statement).all()
+        duration = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        n_identity_map = len(session.identity_map)
+    tracemalloc.stop()
+    return dict(
+        rows=len(rows),
+        bytes_per_row=current / len(rows),
+        peak_mb=peak / 2**20,
+        fetch_ms=duration * 1000,
+        identity_map=n_identity_map,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    user_id = populate(engine, args.projects)
+
+    print(
+        f"{'statement':>12} {'bytes/row':>10} {'peak (MB)':>10} "
+        f"{'fetch (ms)':>11} {'identity map':>13}"
+    )
+    for name, statement in statements(user_id).items():
+        results = measure(engine, statement)
+        assert results["rows"] == args.projects
+        print(
+            f"{name:>12} {results['bytes_per_row']:>10.0f} "
+            f"{results['peak_mb']:>10.1f} {results['fetch_ms']:>11.1f} "
+            f"{results['identity_map']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of the serialization of read responses, through the response model
+and through `FastJSONResponse`.
+
+For a list of N projects (as returned by `GET /api/v1/project/`), the
+benchmark compares:
+
+* the previous path: each row is validated into `ProjectRead`, converted by
+  `jsonable_encoder` and rendered by `JSONResponse`;
+* the current path: rows are turned into dictionaries by `_serialize_fields`
+  and rendered by `FastJSONResponse` (with orjson, if installed).
+
+For each path it reports the number of requests per second and the CPU time
+per request (serialization only, database excluded).
+
+Usage:
+
+    python benchmarks/json_responses.py [--projects 1 100 10000]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from datetime import timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from fractal_server.app.routes import _responses
+from fractal_server.app.routes._responses import FastJSONResponse
+from fractal_server.app.routes._sparse_fieldsets import _serialize_fields
+from fractal_server.app.schemas import ProjectRead
+
+FIELDS = list(ProjectRead.__fields__)
+
+
+def make_rows(n_projects: int) -> list[dict]:
+    timestamp = datetime.now(tz=timezone.utc)
+    return [
+        dict(
+            id=ind,
+            name=f"project {ind}",
+            read_only=bool(ind % 2),
+            timestamp_created=timestamp,
+        )
+        for ind in range(n_projects)
+    ]
+
+
+def response_model_path(rows: list[dict]) -> bytes:
+    content = [ProjectRead(**row) for row in rows]
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def fast_path(rows: list[dict]) -> bytes:
+    content = [_serialize_fields(row, FIELDS) for row in rows]
+    return FastJSONResponse(content=content).body
+
+
+def measure(func, rows: list[dict], repeat: int) -> dict:
+    """
+    Return the requests per second (from the median wall time) and the median
+    CPU time per request, in milliseconds.
+    """
+    wall_times = []
+    cpu_times = []
+    for _ in range(repeat):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        func(rows)
+        cpu_times.append((time.process_time() - cpu_start) * 1000)
+        wall_times.append(time.perf_counter() - wall_start)
+    return dict(
+        rps=1 / statistics.median(wall_times),
+        cpu_ms=statistics.median(cpu_times),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--projects", type=int, nargs="+", default=[1, 100, 10_000]
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = dict(response_model=response_model_path, fast=fast_path)
+    print(f"orjson installed: {_responses.orjson is not None}")
+    print(f"{'projects':>10} {'path':>15} {'req/s':>12} {'CPU (ms)':>10}")
+    for n_projects in args.projects:
+        rows = make_rows(n_projects)
+        for name, func in paths.items():
+            results = measure(func, rows, repeat=args.repeat)
+            print(
+                f"{n_projects:>10} {name:>15} "
+                f"{results['rps']:>12.1f} {results['cpu_ms']:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
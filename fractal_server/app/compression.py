@@ -0,0 +1,221 @@
+"""
+Compression of HTTP responses.
+
+Responses are compressed with the best encoding accepted by the client,
+among zstd (if [zstandard](https://pypi.org/project/zstandard/) is
+installed), brotli (if [brotli](https://pypi.org/project/Brotli/) is
+installed) and gzip. Only responses with an allowed content type, and at
+least a minimum size, are compressed (see the `FRACTAL_COMPRESSION_*`
+settings).
+
+Streaming responses (e.g. NDJSON listings) are compressed chunk by chunk,
+flushing the compressor after each chunk so that clients receive data as
+soon as it is produced.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from ..config import get_settings
+from ..syringe import Inject
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _available_compressors() -> dict[str, type]:
+    """
+    Return the available compressors, by encoding, in order of preference.
+    """
+    compressors: dict[str, type] = {}
+    if zstandard is not None:
+        compressors["zstd"] = _ZstdCompressor
+    if brotli is not None:
+        compressors["br"] = _BrotliCompressor
+    compressors["gzip"] = _GzipCompressor
+    return compressors
+
+
+COMPRESSORS = _available_compressors()
+
+
+def _select_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Select the preferred available encoding accepted by the client.
+
+    Args:
+        accept_encoding: The value of the `Accept-Encoding` request header.
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.lower())
+    for encoding in COMPRESSORS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses HTTP responses.
+
+    Strong entity tags of compressed responses are made weak, since the
+    compressed bytes depend on the encoding and on the compression level.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = Inject(get_settings)
+        minimum_size = settings.FRACTAL_COMPRESSION_MINIMUM_SIZE
+        encoding = _select_encoding(
+            Headers(scope=scope).get("accept-encoding")
+        )
+        if minimum_size is None or encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_types = set(
+            settings.FRACTAL_COMPRESSION_CONTENT_TYPES.split(";")
+        )
+        level = settings.FRACTAL_COMPRESSION_LEVEL
+        start_message: Optional[Message] = None
+        compressor = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.split(";")[0].strip() not in content_types
+                ):
+                    await send(message)
+                else:
+                    # Wait for the first body chunk, to know its size
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or (
+                start_message is None and compressor is None
+            ):
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(
+                    raw=list(start_message.get("headers", []))
+                )
+                if not more_body and len(body) < minimum_size:
+                    await send(start_message)
+                    await send(message)
+                    start_message = None
+                    return
+                compressor = COMPRESSORS[encoding](level)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.compress(body) + compressor.flush()
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                start_message["headers"] = headers.raw
+                await send(start_message)
+                start_message = None
+            elif more_body:
+                body = compressor.compress(body) + compressor.flush()
+            else:
+                body = compressor.compress(body) + compressor.finish()
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body,
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_compressed)
@@ -5,8 +5,10 @@ https://testdriven.io/blog/fastapi-sqlmodel/#async-sqlmodel
 from typing import AsyncGenerator
 from typing import Generator
 
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session as DBSyncSession
@@ -14,8 +16,14 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from ...config import get_settings
+from ...config import Settings
 from ...logger import set_logger
 from ...syringe import Inject
+from ._context import bind_request_db_state
+from ._context import DBStatsMiddleware  # noqa: F401
+from ._context import get_request_db_state
+from ._pool import InstrumentedAsyncQueuePool
+from ._query_stats import instrument_engine
 
 
 print(__name__)
@@ -28,6 +36,75 @@ SQLITE_WARNING_MESSAGE = (
 )
 
 
+def _set_sqlite_pragmas_on_connect(
+    engine: Engine,
+    settings: Settings,
+    *,
+    query_only: bool = False,
+):
+    """
+    Apply the SQLite tuning profile from `settings` to every new connection
+    of `engine`.
+
+    For async engines, this must be called on `AsyncEngine.sync_engine`.
+
+    Args:
+        engine: The (sync) engine to configure.
+        settings: The settings holding the `SQLITE_*` tuning options.
+        query_only: If `True`, also prevent any change to the database
+            through these connections.
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+        (
+            "PRAGMA foreign_keys="
+            f"{'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}"
+        ),
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def _mark_request_has_written(
+    conn, cursor, statement, parameters, context, executemany
+):
+    """
+    Flag the current request as having written to the primary database.
+    """
+    if context is None:
+        return
+    if context.isinsert or context.isupdate or context.isdelete:
+        state = get_request_db_state()
+        if state is not None:
+            state.has_written = True
+
+
+class _ReplicaSession(DBSyncSession):
+    """
+    Session bound to a read-only replica, which switches to the primary
+    engine (stored in `info["primary_engine"]`) when flushing and after the
+    current request has written to the primary database.
+    """
+
+    def get_bind(self, mapper=None, **kwargs):
+        state = get_request_db_state()
+        if self._flushing or (state is not None and state.has_written):
+            return self.info["primary_engine"]
+        return super().get_bind(mapper, **kwargs)
+
+
 class DB:
     """
     DB class
@@ -41,6 +118,18 @@ class DB:
             cls.set_async_db()
             return cls._engine_async
 
+    @classmethod
+    def engine_async_readonly(cls):
+        """
+        Return the engine dedicated to read-only sessions, or `None` if
+        read-only sessions use the main async engine.
+        """
+        try:
+            return cls._engine_async_readonly
+        except AttributeError:
+            cls.set_async_db()
+            return cls._engine_async_readonly
+
     @classmethod
     def engine_sync(cls):
         try:
@@ -57,11 +146,26 @@ class DB:
         if settings.DB_ENGINE == "sqlite":
             logger.warning(SQLITE_WARNING_MESSAGE)
             # Set some sqlite-specific options
-            engine_kwargs_async = dict(poolclass=StaticPool)
+            if settings.SQLITE_READ_POOL_SIZE > 0:
+                # A single writer connection, which sessions wait for in turn
+                engine_kwargs_async = dict(
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_size=1,
+                    max_overflow=0,
+                    pool_timeout=settings.DB_POOL_TIMEOUT,
+                )
+            else:
+                engine_kwargs_async = dict(poolclass=StaticPool)
         else:
-            engine_kwargs_async = {
-                "pool_pre_ping": True,
-            }
+            engine_kwargs_async = dict(
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+                pool_use_lifo=settings.DB_POOL_USE_LIFO,
+            )
 
         cls._engine_async = create_async_engine(
             settings.DATABASE_URL,
@@ -69,6 +173,12 @@ class DB:
             future=True,
             **engine_kwargs_async,
         )
+        instrument_engine(cls._engine_async.sync_engine, settings)
+        if settings.DB_ENGINE == "sqlite":
+            _set_sqlite_pragmas_on_connect(
+                cls._engine_async.sync_engine, settings
+            )
+
         cls._async_session_maker = sessionmaker(
             cls._engine_async,
             class_=AsyncSession,
@@ -76,6 +186,64 @@ class DB:
             future=True,
         )
 
+        # Read-only engine, either for a replica or for a pool of read-only
+        # connections to the same SQLite database
+        readonly_url = settings.DATABASE_READONLY_URL
+        if settings.DB_ENGINE == "sqlite":
+            use_readonly_engine = (
+                readonly_url is not None or settings.SQLITE_READ_POOL_SIZE > 0
+            )
+            if settings.SQLITE_READ_POOL_SIZE > 0:
+                engine_kwargs_readonly = dict(
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_size=settings.SQLITE_READ_POOL_SIZE,
+                    max_overflow=0,
+                    pool_timeout=settings.DB_POOL_TIMEOUT,
+                )
+            else:
+                engine_kwargs_readonly = dict(poolclass=StaticPool)
+        else:
+            use_readonly_engine = readonly_url is not None
+            engine_kwargs_readonly = engine_kwargs_async
+
+        if not use_readonly_engine:
+            cls._engine_async_readonly = None
+            cls._async_session_maker_readonly = cls._async_session_maker
+        else:
+            cls._engine_async_readonly = create_async_engine(
+                readonly_url or settings.DATABASE_URL,
+                echo=settings.DB_ECHO,
+                future=True,
+                **engine_kwargs_readonly,
+            )
+            instrument_engine(cls._engine_async_readonly.sync_engine, settings)
+            if settings.DB_ENGINE == "sqlite":
+                _set_sqlite_pragmas_on_connect(
+                    cls._engine_async_readonly.sync_engine,
+                    settings,
+                    query_only=True,
+                )
+            session_kwargs = {}
+            if readonly_url is not None:
+                # A replica may lag behind the primary database, so requests
+                # that have written must keep reading from the primary one
+                session_kwargs = dict(
+                    sync_session_class=_ReplicaSession,
+                    info=dict(primary_engine=cls._engine_async.sync_engine),
+                )
+                event.listen(
+                    cls._engine_async.sync_engine,
+                    "after_cursor_execute",
+                    _mark_request_has_written,
+                )
+            cls._async_session_maker_readonly = sessionmaker(
+                cls._engine_async_readonly,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                future=True,
+                **session_kwargs,
+            )
+
     @classmethod
     def set_sync_db(cls):
         settings = Inject(get_settings)
@@ -105,18 +273,23 @@ class DB:
             future=True,
         )
 
-        @event.listens_for(cls._engine_sync, "connect")
-        def set_sqlite_pragma(dbapi_connection, connection_record):
-            if settings.DB_ENGINE == "sqlite":
-                cursor = dbapi_connection.cursor()
-                cursor.execute("PRAGMA journal_mode=WAL")
-                cursor.close()
+        instrument_engine(cls._engine_sync, settings)
+        if settings.DB_ENGINE == "sqlite":
+            _set_sqlite_pragmas_on_connect(cls._engine_sync, settings)
 
     @classmethod
-    async def get_async_db(cls) -> AsyncGenerator[AsyncSession, None]:
+    async def get_async_db(
+        cls, request: Request = None
+    ) -> AsyncGenerator[AsyncSession, None]:
         """
         Get async database session
+
+        Args:
+            request: The request being served, if any (automatically set
+                when used as a FastAPI dependency).
         """
+        if request is not None:
+            bind_request_db_state(request)
         try:
             session_maker = cls._async_session_maker()
         except AttributeError:
@@ -125,6 +298,32 @@ class DB:
         async with session_maker as async_session:
             yield async_session
 
+    @classmethod
+    async def get_async_db_readonly(
+        cls, request: Request = None
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Get async database session, to be used for read-only operations
+
+        If no dedicated read-only engine is configured, the session is bound
+        to the main async engine. If the read-only engine points to a
+        replica, the session reads from the primary database as soon as the
+        current request has written to it.
+
+        Args:
+            request: The request being served, if any (automatically set
+                when used as a FastAPI dependency).
+        """
+        if request is not None:
+            bind_request_db_state(request)
+        try:
+            session_maker = cls._async_session_maker_readonly()
+        except AttributeError:
+            cls.set_async_db()
+            session_maker = cls._async_session_maker_readonly()
+        async with session_maker as async_session:
+            yield async_session
+
     @classmethod
     def get_sync_db(cls) -> Generator[DBSyncSession, None, None]:
         """
@@ -140,4 +339,5 @@ class DB:
 
 
 get_async_db = DB.get_async_db
+get_async_db_readonly = DB.get_async_db_readonly
 get_sync_db = DB.get_sync_db
@@ -0,0 +1,163 @@
+"""
+Request-scoped state of the database layer.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from fastapi import Request
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from ...config import get_settings
+from ...logger import set_logger
+from ...syringe import Inject
+
+
+logger = set_logger(__name__)
+
+
+@dataclass
+class RequestDBState:
+    """
+    Database-related state of the request being served.
+
+    Attributes:
+        route: Method and path template of the route being served.
+        has_written: Whether the request has already written through the
+            primary engine.
+        n_statements: Number of SQL statements executed (each set of
+            parameters of an `executemany` counts as one statement).
+        n_round_trips: Number of calls to the database driver.
+        db_time_ms: Total time spent in the database driver, in
+            milliseconds.
+        fingerprints: Number of executions of each statement fingerprint.
+    """
+
+    route: Optional[str] = None
+    has_written: bool = False
+    n_statements: int = 0
+    n_round_trips: int = 0
+    db_time_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def record_statement(
+        self, fingerprint: str, duration_ms: float, n_statements: int = 1
+    ) -> None:
+        self.n_statements += n_statements
+        self.n_round_trips += 1
+        self.db_time_ms += duration_ms
+        self.fingerprints[fingerprint] += 1
+
+
+_request_db_state: ContextVar[Optional[RequestDBState]] = ContextVar(
+    "request_db_state", default=None
+)
+
+
+def get_request_db_state() -> Optional[RequestDBState]:
+    """
+    Return the state of the request being served, if any.
+    """
+    return _request_db_state.get()
+
+
+def _get_route(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    return f"{request.method} {path}"
+
+
+def bind_request_db_state(request: Request) -> RequestDBState:
+    """
+    Make the state of `request` the current one, creating it if needed.
+
+    The state is stored in `request.state`, so that all database dependencies
+    of the same request (and `DBStatsMiddleware`) share it.
+
+    Args:
+        request: The request being served.
+    """
+    state = getattr(request.state, "db", None)
+    if state is None:
+        state = RequestDBState()
+        request.state.db = state
+    if state.route is None:
+        state.route = _get_route(request)
+    _request_db_state.set(state)
+    return state
+
+
+class DBStatsMiddleware:
+    """
+    ASGI middleware that reports the database usage of each HTTP request.
+
+    The number of statements is returned in the `X-DB-Queries` response
+    header, and the time spent in the database in the `Server-Timing` one.
+    A warning is logged when a request executes more than
+    `DB_REQUEST_QUERY_BUDGET` statements, or the same statement more than
+    `DB_REPEATED_QUERY_THRESHOLD` times (a typical N+1 pattern).
+
+    Note that statements executed after the response headers are sent (e.g.
+    when closing the session) are not included in the headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = RequestDBState()
+        scope.setdefault("state", {})["db"] = state
+        token = _request_db_state.set(state)
+
+        async def send_with_db_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"x-db-queries", str(state.n_statements).encode())
+                )
+                headers.append(
+                    (
+                        b"server-timing",
+                        (
+                            f"db;dur={state.db_time_ms:.1f};"
+                            f'desc="{state.n_round_trips} round-trips"'
+                        ).encode(),
+                    )
+                )
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_db_stats)
+        finally:
+            _request_db_state.reset(token)
+            self._check_budget(state)
+
+    @staticmethod
+    def _check_budget(state: RequestDBState) -> None:
+        settings = Inject(get_settings)
+        budget = settings.DB_REQUEST_QUERY_BUDGET
+        if budget is not None and state.n_statements > budget:
+            logger.warning(
+                f"{state.route} executed {state.n_statements} statements "
+                f"({state.n_round_trips} round-trips, "
+                f"{state.db_time_ms:.1f} ms), above the budget of {budget}."
+            )
+        threshold = settings.DB_REPEATED_QUERY_THRESHOLD
+        if threshold is not None and state.fingerprints:
+            fingerprint, count = state.fingerprints.most_common(1)[0]
+            if count > threshold:
+                logger.warning(
+                    f"{state.route} executed the same statement {count} "
+                    f"times (possible N+1 pattern): {fingerprint}"
+                )
@@ -0,0 +1,68 @@
+"""
+Connection-pool instrumentation.
+"""
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import QueuePool
+
+from ._stats import LatencyHistogram
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` that also records how long each checkout waits
+    for a connection, and how many checkouts time out.
+
+    Note that the measured wait also includes the time needed to open a new
+    connection, when the pool has to create one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = LatencyHistogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        t_start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_histogram.observe(
+                (time.perf_counter() - t_start) * 1000.0
+            )
+
+
+def get_pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Collect the current status of the connection pool of an engine.
+
+    For pools that do not keep a queue of connections (e.g. the `StaticPool`
+    used for SQLite), only the pool class is reported.
+
+    Args:
+        engine: The engine whose pool should be inspected.
+    """
+    pool = engine.sync_engine.pool
+    status: dict[str, Any] = dict(pool_class=type(pool).__name__)
+    if isinstance(pool, QueuePool):
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        status.update(
+            timeouts=pool.timeouts,
+            wait_time=pool.wait_histogram.dump(),
+        )
+    return status
@@ -0,0 +1,219 @@
+"""
+Per-statement latency statistics and slow-query log.
+"""
+import re
+import threading
+import time
+from typing import Any
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ...config import Settings
+from ...logger import set_logger
+from ._context import get_request_db_state
+from ._stats import LatencyHistogram
+
+
+logger = set_logger(__name__)
+
+MAX_STATEMENTS = 1000
+MAX_ROUTES_PER_STATEMENT = 20
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):\w+|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Normalize a SQL statement, so that executions that only differ by their
+    parameters share the same fingerprint.
+
+    Whitespace is collapsed, literals and bound-parameter placeholders are
+    replaced by `?` and lists of placeholders (e.g. from expanding `IN`
+    clauses) are collapsed to `(?, ...)`.
+
+    Args:
+        statement: The SQL statement, as sent to the driver.
+    """
+    fingerprint = _WHITESPACE.sub(" ", statement).strip()
+    fingerprint = _STRING_LITERAL.sub("?", fingerprint)
+    fingerprint = _PLACEHOLDER.sub("?", fingerprint)
+    fingerprint = _PLACEHOLDER_LIST.sub("(?, ...)", fingerprint)
+    return fingerprint
+
+
+class _StatementStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.routes: set[str] = set()
+        self.latency = LatencyHistogram()
+
+
+class QueryStats:
+    """
+    In-process registry of per-statement statistics.
+
+    Statistics are grouped by statement fingerprint (see
+    `fingerprint_statement`); at most `max_statements` distinct fingerprints
+    are tracked, and further ones are ignored.
+    """
+
+    def __init__(self, max_statements: int = MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements: dict[str, _StatementStats] = {}
+
+    def record(
+        self,
+        fingerprint: str,
+        duration_ms: float,
+        rowcount: Optional[int],
+        route: Optional[str],
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._statements.get(fingerprint)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    return
+                stats = _StatementStats()
+                self._statements[fingerprint] = stats
+            stats.calls += 1
+            if failed:
+                stats.errors += 1
+            if rowcount is not None:
+                stats.rows += rowcount
+            if (
+                route is not None
+                and len(stats.routes) < MAX_ROUTES_PER_STATEMENT
+            ):
+                stats.routes.add(route)
+        stats.latency.observe(duration_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements = {}
+
+    def dump(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """
+        Return the statistics of each statement, sorted by decreasing total
+        execution time.
+
+        Args:
+            limit: If set, only return the first `limit` statements.
+        """
+        with self._lock:
+            items = list(self._statements.items())
+        data = []
+        for fingerprint, stats in items:
+            latency = stats.latency.dump()
+            data.append(
+                dict(
+                    statement=fingerprint,
+                    calls=stats.calls,
+                    errors=stats.errors,
+                    rows=stats.rows,
+                    total_ms=latency["sum_ms"],
+                    mean_ms=round(latency["sum_ms"] / max(stats.calls, 1), 3),
+                    max_ms=latency["max_ms"],
+                    routes=sorted(stats.routes),
+                    latency=latency,
+                )
+            )
+        data.sort(key=lambda item: item["total_ms"], reverse=True)
+        return data[:limit]
+
+
+query_stats = QueryStats()
+
+
+def instrument_engine(engine: Engine, settings: Settings) -> None:
+    """
+    Record the latency of every statement executed by `engine` in
+    `query_stats`, and log the statements slower than `DB_SLOW_QUERY_MS`.
+    Failed statements are recorded as well, and also counted as `errors`.
+
+    For async engines, this must be called on `AsyncEngine.sync_engine`.
+
+    Args:
+        engine: The (sync) engine to instrument.
+        settings: The settings holding the `DB_*` query-logging options.
+    """
+    slow_query_ms = settings.DB_SLOW_QUERY_MS
+
+    def _record(
+        statement: str,
+        parameters,
+        executemany: bool,
+        duration_ms: float,
+        rowcount: Optional[int],
+        failed: bool,
+    ) -> None:
+        fingerprint = fingerprint_statement(statement)
+        state = get_request_db_state()
+        if state is None:
+            route = None
+        else:
+            route = state.route
+            state.record_statement(
+                fingerprint,
+                duration_ms,
+                n_statements=len(parameters) if executemany else 1,
+            )
+        query_stats.record(
+            fingerprint, duration_ms, rowcount, route, failed=failed
+        )
+        if slow_query_ms is not None and duration_ms > slow_query_ms:
+            logger.warning(
+                f"Slow query ({duration_ms:.1f} ms, {rowcount=}, "
+                f"{route=}{', failed' if failed else ''}): {fingerprint}"
+            )
+
+    # NOTE: the start time is kept on the execution context, rather than on
+    # the (possibly long-lived) connection, so that nothing is left behind by
+    # statements that fail
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        t_start = getattr(context, "_query_start_time", None)
+        if t_start is None:
+            return
+        context._query_start_time = None
+        _record(
+            statement,
+            parameters,
+            executemany,
+            duration_ms=(time.perf_counter() - t_start) * 1000.0,
+            rowcount=cursor.rowcount if cursor.rowcount >= 0 else None,
+            failed=False,
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        t_start = getattr(context, "_query_start_time", None)
+        if t_start is None:
+            return
+        context._query_start_time = None
+        _record(
+            exception_context.statement,
+            exception_context.parameters,
+            context.executemany,
+            duration_ms=(time.perf_counter() - t_start) * 1000.0,
+            rowcount=None,
+            failed=True,
+        )
@@ -0,0 +1,67 @@
+"""
+Lightweight in-process statistics for the database layer.
+"""
+import threading
+from bisect import bisect_left
+from typing import Any
+from typing import Optional
+
+
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of durations, expressed in milliseconds.
+
+    Each observation is counted in the first bucket whose upper bound is
+    greater or equal than the observed value; values larger than the last
+    bound are counted in an additional `+Inf` bucket.
+
+    Attributes:
+        buckets_ms: Upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets_ms) + 1)
+            self._sum_ms = 0.0
+            self._max_ms: Optional[float] = None
+
+    def observe(self, value_ms: float) -> None:
+        index = bisect_left(self.buckets_ms, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += value_ms
+            if self._max_ms is None or value_ms > self._max_ms:
+                self._max_ms = value_ms
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def dump(self) -> dict[str, Any]:
+        """
+        Return a JSON-serializable snapshot of the histogram.
+
+        The `le_ms` bound of the last bucket is `None`, meaning `+Inf`.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            sum_ms = self._sum_ms
+            max_ms = self._max_ms
+        bounds = list(self.buckets_ms) + [None]
+        return dict(
+            count=sum(counts),
+            sum_ms=round(sum_ms, 3),
+            max_ms=None if max_ms is None else round(max_ms, 3),
+            buckets=[
+                dict(le_ms=bound, count=count)
+                for bound, count in zip(bounds, counts)
+            ],
+        )
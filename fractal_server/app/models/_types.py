@@ -0,0 +1,37 @@
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+from sqlalchemy.types import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware timestamp, always returned in UTC.
+
+    SQLite stores datetimes as strings without their timezone, and returns
+    them as naive objects; Postgres returns them in the timezone of the
+    connection. Values are converted to UTC when written (so that SQLite
+    stores UTC wall times) and when read, so that both engines return
+    UTC-aware datetimes.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[datetime], dialect
+    ) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(
+        self, value: Optional[datetime], dialect
+    ) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
@@ -1,11 +1,45 @@
+from sqlalchemy import Index
+from sqlalchemy import text
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field
 from sqlmodel import SQLModel
 
 
+def _get_project_name(context) -> str:
+    """
+    Default value of `LinkUserProject.project_name`, for links that are not
+    created explicitly (e.g. through the `Project.user_list` relationship).
+    """
+    project_id = context.get_current_parameters()["project_id"]
+    return context.connection.execute(
+        text("SELECT name FROM project WHERE id = :project_id"),
+        dict(project_id=project_id),
+    ).scalar_one()
+
+
 class LinkUserProject(SQLModel, table=True):
     """
     Crossing table between User and Project
+
+    The project name is denormalized here, so that the uniqueness of project
+    names for each user is enforced by the database.
     """
 
+    __table_args__ = (
+        # Membership lookups filter by `user_id` first, which the primary key
+        # on `(project_id, user_id)` cannot serve
+        Index(
+            "ix_linkuserproject_user_id_project_id", "user_id", "project_id"
+        ),
+        UniqueConstraint(
+            "user_id",
+            "project_name",
+            name="uq_linkuserproject_user_id_project_name",
+        ),
+    )
+
     project_id: int = Field(foreign_key="project.id", primary_key=True)
     user_id: int = Field(foreign_key="user_oauth.id", primary_key=True)
+    project_name: str = Field(
+        nullable=False, sa_column_kwargs={"default": _get_project_name}
+    )
@@ -2,29 +2,132 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import Column
-from sqlalchemy.types import DateTime
+from sqlalchemy import DDL
+from sqlalchemy import event
+from sqlalchemy import Index
+from sqlalchemy import inspect
+from sqlalchemy import update
+from sqlalchemy.orm import object_session
+from sqlalchemy.types import Integer
 from sqlmodel import Field
 from sqlmodel import Relationship
 from sqlmodel import SQLModel
 
 from ...utils import get_timestamp
 from ..schemas.project import _ProjectBase
+from ._types import UTCDateTime
 from .linkuserproject import LinkUserProject
 from .security import UserOAuth
 
 
 class Project(_ProjectBase, SQLModel, table=True):
 
+    __table_args__ = (Index("ix_project_name", "name"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp_created: datetime = Field(
         default_factory=get_timestamp,
-        sa_column=Column(DateTime(timezone=True), nullable=False),
+        sa_column=Column(UTCDateTime, nullable=False),
+    )
+    # Row version (used for entity tags), incremented at every update of the
+    # project: explicitly by Core UPDATEs, and by `_increment_version` for
+    # ORM updates. It is not an ORM `version_id_col`, so that instances
+    # loaded before a Core UPDATE can still be updated or deleted.
+    version: int = Field(
+        default=1,
+        sa_column=Column(Integer, nullable=False, server_default="1"),
     )
 
     user_list: list[UserOAuth] = Relationship(
         link_model=LinkUserProject,
         back_populates="project_list",
         sa_relationship_kwargs={
-            "lazy": "selectin",
+            "lazy": "raise",
         },
     )
+
+
+@event.listens_for(Project, "before_update")
+def _increment_version(mapper, connection, target: Project):
+    """
+    Increment the row version of a project updated through the ORM.
+
+    Projects whose only changes are to their relationships (e.g. to
+    `user_list`) are not updated, and keep their version.
+    """
+    if object_session(target).is_modified(target, include_collections=False):
+        target.version += 1
+
+
+@event.listens_for(Project, "after_update")
+def _update_link_project_name(mapper, connection, target: Project):
+    """
+    Keep `LinkUserProject.project_name` in sync when a project is renamed.
+    """
+    if inspect(target).attrs.name.history.has_changes():
+        link_table = LinkUserProject.__table__  # type: ignore
+        connection.execute(
+            update(link_table)
+            .where(link_table.c.project_id == target.id)
+            .values(project_name=target.name)
+        )
+
+
+# Full-text search of project names (see `GET /api/v1/project/search/`).
+# These objects are not part of the metadata (and are ignored by Alembic
+# autogenerate): on SQLite, an FTS5 table with the trigram tokenizer, which
+# indexes `project.name` and is kept in sync by triggers; on Postgres, a
+# trigram GIN index.
+# Migration `f3b8a2d6c914` creates the same objects; changing them requires
+# a new migration.
+# NOTE: recreating the `project` table (e.g. in a batch migration on SQLite)
+# drops the triggers, which must then be created again.
+_PROJECT_SEARCH_SQLITE_DDL = [
+    (
+        "CREATE VIRTUAL TABLE project_fts USING fts5("
+        "name, content='project', content_rowid='id', tokenize='trigram')"
+    ),
+    (
+        "CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN "
+        "INSERT INTO project_fts(rowid, name) VALUES (new.id, new.name); "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN "
+        "INSERT INTO project_fts(project_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER project_fts_au AFTER UPDATE OF name ON project BEGIN "
+        "INSERT INTO project_fts(project_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO project_fts(rowid, name) VALUES (new.id, new.name); "
+        "END"
+    ),
+]
+_PROJECT_SEARCH_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    (
+        "CREATE INDEX ix_project_name_trgm ON project "
+        "USING gin (name gin_trgm_ops)"
+    ),
+]
+
+for _statement in _PROJECT_SEARCH_SQLITE_DDL:
+    event.listen(
+        Project.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+for _statement in _PROJECT_SEARCH_POSTGRES_DDL:
+    event.listen(
+        Project.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    Project.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS project_fts").execute_if(dialect="sqlite"),
+)
@@ -2,6 +2,8 @@ from typing import Optional
 
 from pydantic import EmailStr
 from sqlalchemy import Column
+from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy.types import JSON
 from sqlmodel import Field
 from sqlmodel import Relationship
@@ -51,13 +53,21 @@ class UserOAuth(SQLModel, table=True):
 
     oauth_accounts: list["OAuthAccount"] = Relationship(
         back_populates="user",
-        sa_relationship_kwargs={"lazy": "joined", "cascade": "all, delete"},
+        sa_relationship_kwargs={"lazy": "raise", "cascade": "all, delete"},
     )
     project_list: list["Project"] = Relationship(  # noqa
         back_populates="user_list",
         link_model=LinkUserProject,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
     class Config:
         orm_mode = True
+
+
+# Case-insensitive lookups by email (as in login, registration and OAuth
+# association) filter on `lower(email)`, which cannot use `ix_user_oauth_email`
+Index(
+    "ix_user_oauth_email_lower",
+    func.lower(UserOAuth.__table__.c.email),  # type: ignore
+)
@@ -0,0 +1,47 @@
+"""
+Entity tags and conditional requests for read endpoints.
+"""
+from typing import Optional
+
+from fastapi import Response
+from fastapi import status
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether the `If-None-Match` request header matches an entity tag.
+
+    As required for `If-None-Match`, the weak comparison is used (i.e. the
+    `W/` prefix is ignored).
+
+    Args:
+        if_none_match: The value of the `If-None-Match` header, if any.
+        etag: The current entity tag of the resource.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def _opaque_tag(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return _opaque_tag(etag) in {
+        _opaque_tag(tag) for tag in if_none_match.split(",")
+    }
+
+
+def _not_modified(etag: str, vary: Optional[str] = None) -> Response:
+    """
+    Return an empty `304 Not Modified` response.
+
+    Args:
+        etag: The current entity tag of the resource.
+        vary: The `Vary` header of the corresponding `200` response, if any;
+            a 304 response must include it as well.
+    """
+    headers = {"ETag": etag}
+    if vary is not None:
+        headers["Vary"] = vary
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,58 @@
+"""
+Fast JSON responses for read endpoints.
+
+Read endpoints build their responses directly from the selected rows (see
+`_sparse_fieldsets`), trusting the database instead of validating each row
+against the response model, and render them with `FastJSONResponse`.
+
+Rendering uses [orjson](https://github.com/ijl/orjson) when it is installed
+(through the `orjson` extra, i.e. `pip install "fractal-server[orjson]"`),
+and falls back to the standard library otherwise; both produce the same JSON.
+"""
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Serialize the non-JSON types found in rows, for the standard library.
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def _dumps(content: Any) -> bytes:
+    """
+    Serialize `content` as compact UTF-8 JSON.
+
+    Args:
+        content: JSON-compatible data, possibly including `datetime`s.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        default=_json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response which skips `jsonable_encoder`, and uses orjson if it is
+    available.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
@@ -0,0 +1,87 @@
+"""
+Sparse fieldsets for read endpoints.
+
+Read endpoints accept a `fields` query parameter (a comma-separated list of
+attributes of their response model). When it is set, only the requested
+columns are selected. In any case, rows are serialized directly (and
+rendered with `FastJSONResponse`) instead of going through the validation of
+the response model.
+"""
+from typing import Any
+from typing import Mapping
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi import status
+from pydantic import BaseModel
+from sqlalchemy import Column
+from sqlmodel import SQLModel
+
+
+def _parse_fields(
+    fields: Optional[str], schema: type[BaseModel]
+) -> Optional[list[str]]:
+    """
+    Parse the `fields` query parameter.
+
+    Args:
+        fields: Comma-separated list of attributes, or `None`.
+        schema: The response model of the endpoint.
+
+    Returns:
+        The list of requested attributes (without repetitions), or `None` if
+        `fields` is not set.
+
+    Raises:
+        HTTPException(status_code=422_UNPROCESSABLE_ENTITY):
+            If `fields` is empty or includes attributes not in `schema`.
+    """
+    if fields is None:
+        return None
+    field_list = list(
+        dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())
+    )
+    invalid_fields = [f for f in field_list if f not in schema.__fields__]
+    if not field_list or invalid_fields:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                f"Invalid fields {invalid_fields} (valid fields: "
+                f"{list(schema.__fields__)})."
+            ),
+        )
+    return field_list
+
+
+def _select_columns(model: type[SQLModel], fields: list[str]) -> list[Column]:
+    """
+    Return the table columns of `model` corresponding to some attributes.
+
+    A statement which only involves table columns (rather than ORM
+    attributes) is executed as a plain Core statement: rows are returned as
+    lightweight tuples, with no ORM loading, identity map or instance state.
+
+    Args:
+        model: The table model.
+        fields: The requested attributes.
+    """
+    table = model.__table__  # type: ignore
+    return [table.c[field] for field in fields]
+
+
+def _serialize_fields(
+    row: Mapping[str, Any], fields: list[str]
+) -> dict[str, Any]:
+    """
+    Build the response item with the requested attributes of a row.
+
+    Values are trusted as they come from the database, and are not validated
+    against the response model; timestamps are already UTC-aware (see
+    `UTCDateTime`), and are left as `datetime`s, to be serialized by
+    `FastJSONResponse`.
+
+    Args:
+        row: The selected row, as a mapping from attribute names to values.
+        fields: The requested attributes.
+    """
+    return {field: row[field] for field in fields}
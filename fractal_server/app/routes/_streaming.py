@@ -0,0 +1,67 @@
+"""
+Newline-delimited JSON streaming for list endpoints.
+
+List endpoints return an NDJSON stream (one JSON object per line) when the
+request `Accept` header includes `application/x-ndjson`. Rows are fetched in
+batches from a server-side cursor and serialized as they arrive, so that
+neither the whole result nor the whole response is held in memory.
+"""
+from typing import AsyncGenerator
+from typing import Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from ._responses import _dumps
+from ._sparse_fieldsets import _serialize_fields
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_YIELD_PER = 1000
+
+
+def _accepts_ndjson(accept: Optional[str]) -> bool:
+    """
+    Check whether the `Accept` request header includes NDJSON.
+    """
+    if accept is None:
+        return False
+    media_types = {item.split(";")[0].strip() for item in accept.split(",")}
+    return NDJSON_MEDIA_TYPE in media_types
+
+
+def _stream_ndjson(
+    *,
+    statement: Select,
+    fields: list[str],
+    db: AsyncSession,
+    headers: Optional[dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Stream the results of a statement as NDJSON.
+
+    The session is closed once the stream is over.
+
+    Args:
+        statement: The statement selecting (at least) the columns `fields`.
+        fields: The attributes to include for each row.
+        db: The session to execute `statement` with.
+        headers: Additional response headers.
+    """
+
+    async def _iter_lines() -> AsyncGenerator[bytes, None]:
+        try:
+            result = await db.stream(
+                statement.execution_options(yield_per=STREAM_YIELD_PER)
+            )
+            async for partition in result.partitions():
+                yield b"".join(
+                    _dumps(_serialize_fields(row._mapping, fields)) + b"\n"
+                    for row in partition
+                )
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        _iter_lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
@@ -0,0 +1,68 @@
+"""
+Definition of `/admin` routes.
+"""
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Response
+from fastapi import status
+
+from ..db import DB
+from ..db._pool import get_pool_status
+from ..db._query_stats import query_stats
+from ..security import AuthUser
+from ..security import current_active_superuser
+
+
+router_admin = APIRouter()
+
+
+@router_admin.get("/db/pool/")
+async def get_db_pool_status(
+    user: AuthUser = Depends(current_active_superuser),
+) -> dict:
+    """
+    Return the status of the async database connection pool
+
+    This includes the number of checked-out, idle and overflow connections,
+    and a histogram of the time spent waiting for a connection (when the
+    pool supports it). The `readonly` pool is only reported when read-only
+    sessions use a dedicated engine.
+    """
+    engine_readonly = DB.engine_async_readonly()
+    return dict(
+        primary=get_pool_status(DB.engine_async()),
+        readonly=(
+            get_pool_status(engine_readonly)
+            if engine_readonly is not None
+            else None
+        ),
+    )
+
+
+@router_admin.get("/db/queries/")
+async def get_db_query_stats(
+    limit: Optional[int] = 50,
+    user: AuthUser = Depends(current_active_superuser),
+) -> list[dict]:
+    """
+    Return per-statement latency statistics, sorted by total execution time
+
+    Statements are grouped by fingerprint (i.e. with literals and parameters
+    stripped), and each one comes with its number of calls (and of failed
+    calls, as `errors`) and rows, its latency histogram and the routes that
+    issued it.
+    """
+    return query_stats.dump(limit=limit)
+
+
+@router_admin.delete("/db/queries/", status_code=204)
+async def reset_db_query_stats(
+    user: AuthUser = Depends(current_active_superuser),
+) -> Response:
+    """
+    Reset per-statement latency statistics
+    """
+    query_stats.reset()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,11 +1,27 @@
+import hashlib
+from collections import Counter
+from typing import Any
+from typing import Mapping
+from typing import Optional
+
 from fastapi import HTTPException
 from fastapi import status
+from sqlalchemy import and_
+from sqlalchemy import column
+from sqlalchemy import ColumnElement
+from sqlalchemy import func
+from sqlalchemy import table
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
+from .....config import get_settings
+from .....syringe import Inject
 from ....db import AsyncSession
 from ....models import LinkUserProject
 from ....models import Project
 
+
 async def _get_project_check_owner(
     *,
     project_id: int,
@@ -15,6 +31,11 @@ async def _get_project_check_owner(
     """
     Check that user is a member of project and return the project.
 
+    Both conditions are resolved by a single statement. Successful checks
+    are memoized in `db.info`, so that further checks of the same project and
+    user within the same session (i.e. the same request) do not hit the
+    database again.
+
     Args:
         project_id:
         user_id:
@@ -29,46 +50,308 @@ async def _get_project_check_owner(
         HTTPException(status_code=404_NOT_FOUND):
             If the project does not exist
     """
-    project = await db.get(Project, project_id)
-    link_user_project = await db.get(LinkUserProject, (project_id, user_id))
-    if not project:
+    checked_projects = db.info.setdefault("checked_project_owner", {})
+    project = checked_projects.get((project_id, user_id))
+    # NOTE: deleted or expunged projects are not in the session any more
+    if project is not None and project in db:
+        return project
+
+    row = await _select_project_check_owner(
+        columns=[Project], project_id=project_id, user_id=user_id, db=db
+    )
+    project = row[0]
+    checked_projects[(project_id, user_id)] = project
+    return project
+
+
+async def _get_project_fields_check_owner(
+    *,
+    project_id: int,
+    user_id: int,
+    fields: list[str],
+    db: AsyncSession,
+) -> Mapping[str, Any]:
+    """
+    Check that user is a member of project and return some of the project
+    attributes, without loading the whole project.
+
+    Args:
+        project_id:
+        user_id:
+        fields: The project attributes to select
+        db:
+
+    Returns:
+        The mapping from attribute names to values
+
+    Raises:
+        HTTPException(status_code=403_FORBIDDEN):
+            If the user is not a member of the project
+        HTTPException(status_code=404_NOT_FOUND):
+            If the project does not exist
+    """
+    row = await _select_project_check_owner(
+        columns=[getattr(Project, field) for field in fields],
+        project_id=project_id,
+        user_id=user_id,
+        db=db,
+    )
+    return row._mapping
+
+
+async def _select_project_check_owner(
+    *,
+    columns: list[Any],
+    project_id: int,
+    user_id: int,
+    db: AsyncSession,
+) -> Row:
+    """
+    Select `columns` of a project, together with the membership of the user,
+    and check both conditions.
+    """
+    stm = (
+        select(*columns, LinkUserProject.user_id)
+        .outerjoin(
+            LinkUserProject,
+            and_(
+                LinkUserProject.project_id == Project.id,
+                LinkUserProject.user_id == user_id,
+            ),
+        )
+        .where(Project.id == project_id)
+    )
+    res = await db.execute(stm)
+    row = res.first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    if not link_user_project:
+    if row[-1] is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Not allowed on project {project_id}",
         )
-    return project
+    return row
 
-async def _check_project_exists(
+
+async def _check_projects_owner(
     *,
-    project_name: str,
+    project_ids: list[int],
     user_id: int,
     db: AsyncSession,
 ) -> None:
     """
-    Check that no other project with this name exists for this user.
+    Check that user is a member of several projects, with a single statement.
+
+    Args:
+        project_ids:
+        user_id:
+        db:
+
+    Raises:
+        HTTPException(status_code=403_FORBIDDEN):
+            If the user is not a member of some of the projects
+        HTTPException(status_code=404_NOT_FOUND):
+            If some of the projects do not exist
+    """
+    stm = (
+        select(Project.id, LinkUserProject.user_id)
+        .outerjoin(
+            LinkUserProject,
+            and_(
+                LinkUserProject.project_id == Project.id,
+                LinkUserProject.user_id == user_id,
+            ),
+        )
+        .where(Project.id.in_(project_ids))
+    )
+    res = await db.execute(stm)
+    link_user_ids = dict(res.all())
+    missing_ids = sorted(set(project_ids) - set(link_user_ids))
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Projects {missing_ids} not found",
+        )
+    forbidden_ids = sorted(
+        project_id
+        for project_id, link_user_id in link_user_ids.items()
+        if link_user_id is None
+    )
+    if forbidden_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not allowed on projects {forbidden_ids}",
+        )
+
+
+# Unique constraint on the names of the projects of each user
+_PROJECT_NAME_CONSTRAINT = "uq_linkuserproject_user_id_project_name"
+# SQLite does not report constraint names, but only the constrained columns
+_PROJECT_NAME_CONSTRAINT_SQLITE = (
+    "UNIQUE constraint failed: "
+    "linkuserproject.user_id, linkuserproject.project_name"
+)
+
+
+def _get_constraint_name(error: IntegrityError) -> Optional[str]:
+    """
+    Return the name of the constraint violated by an `IntegrityError`, if
+    reported by the database driver.
+    """
+    # psycopg2
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    # asyncpg, whose exception is wrapped by the SQLAlchemy adapter
+    return getattr(error.orig.__cause__, "constraint_name", None)
+
+
+def _check_project_name_conflict(
+    *,
+    error: IntegrityError,
+    project_name: str,
+) -> None:
+    """
+    Check whether an `IntegrityError` is due to another project with this
+    name existing for the same user.
+
+    Uniqueness is enforced by the unique constraint on
+    `(LinkUserProject.user_id, LinkUserProject.project_name)`, which is
+    identified by its name (or, on SQLite, by its columns).
 
     Args:
+        error: The error raised when writing the project or its membership
         project_name: Project name
+
+    Raises:
+        HTTPException(status_code=422_UNPROCESSABLE_ENTITY):
+            If such a project already exists
+    """
+    constraint_name = _get_constraint_name(error)
+    if constraint_name == _PROJECT_NAME_CONSTRAINT or (
+        constraint_name is None
+        and _PROJECT_NAME_CONSTRAINT_SQLITE in str(error.orig)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Project name ({project_name}) already in use",
+        )
+
+
+async def _check_project_names_available(
+    *,
+    project_names: list[str],
+    user_id: int,
+    db: AsyncSession,
+) -> None:
+    """
+    Check that project names are not repeated, and that no other project
+    with any of these names exists for this user, with a single statement.
+
+    Args:
+        project_names: Project names
         user_id: User ID
         db:
 
     Raises:
         HTTPException(status_code=422_UNPROCESSABLE_ENTITY):
-            If such a project already exists
+            If some names are repeated or already in use
     """
+    repeated_names = sorted(
+        name for name, count in Counter(project_names).items() if count > 1
+    )
+    if repeated_names:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Repeated project names {repeated_names}",
+        )
     stm = (
-        select(Project)
-        .join(LinkUserProject)
-        .where(Project.name == project_name)
+        select(LinkUserProject.project_name)
         .where(LinkUserProject.user_id == user_id)
+        .where(LinkUserProject.project_name.in_(project_names))
     )
     res = await db.execute(stm)
-    if res.scalars().all():
+    existing_names = sorted(res.scalars().all())
+    if existing_names:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Project name ({project_name}) already in use",
+            detail=f"Project names {existing_names} already in use",
+        )
+
+
+def _get_project_etag(*, project_id: int, version: int) -> str:
+    """
+    Return the (strong) entity tag of a project.
+
+    Args:
+        project_id:
+        version: The row version of the project
+    """
+    return f'"{project_id}-{version}"'
+
+
+async def _get_project_list_etag(*, user_id: int, db: AsyncSession) -> str:
+    """
+    Return the (weak) entity tag of the list of projects of a user.
+
+    The tag is computed from the number of projects, the sum of their
+    versions and the latest creation timestamp: creating a project changes
+    the latter, deleting one changes the former and updating one increases
+    the sum of versions.
+
+    Args:
+        user_id:
+        db:
+    """
+    stm = (
+        select(
+            func.count(),
+            func.coalesce(func.sum(Project.version), 0),
+            func.max(Project.timestamp_created),
+        )
+        .select_from(Project)
+        .join(LinkUserProject)
+        .where(LinkUserProject.user_id == user_id)
+    )
+    res = await db.execute(stm)
+    count, sum_version, max_timestamp = res.one()
+    digest = hashlib.blake2b(
+        f"{user_id}-{count}-{sum_version}-{max_timestamp}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _escape_like(value: str) -> str:
+    """
+    Escape the wildcards of a `LIKE` pattern (with `\\` as escape character).
+    """
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _get_project_name_search_clause(q: str) -> ColumnElement:
+    """
+    Return the condition matching projects whose name includes `q`
+    (case-insensitively), served by the search index of the database engine.
+
+    On SQLite, names are matched through the `project_fts` table (whose
+    trigram tokenizer requires at least three characters, so that shorter
+    strings are matched with `LIKE`); on Postgres, `ILIKE` is served by the
+    trigram index on `project.name`.
+
+    Args:
+        q: The string to search for.
+    """
+    project_table = Project.__table__  # type: ignore
+    settings = Inject(get_settings)
+    if settings.DB_ENGINE == "sqlite" and len(q) >= 3:
+        project_fts = table("project_fts", column("rowid"), column("name"))
+        phrase = '"' + q.replace('"', '""') + '"'
+        return project_table.c.id.in_(
+            select(project_fts.c.rowid).where(
+                project_fts.c.name.op("MATCH")(phrase)
+            )
         )
+    return project_table.c.name.ilike(f"%{_escape_like(q)}%", escape="\\")
@@ -3,10 +3,18 @@ from datetime import timezone
 from typing import Optional
 
 from fastapi import APIRouter
+from fastapi import Body
 from fastapi import Depends
+from fastapi import Header
 from fastapi import HTTPException
+from fastapi import Query
 from fastapi import Response
 from fastapi import status
+from sqlalchemy import case
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
@@ -14,62 +22,334 @@ from .....syringe import Inject
 from .....config import get_settings
 from .....logger import close_logger
 from .....logger import set_logger
+from .....utils import get_timestamp
 from ....db import AsyncSession
 from ....db import get_async_db
+from ....db import get_async_db_readonly
 from ....models import LinkUserProject
 from ....models import Project
+from ..._etag import _etag_matches
+from ..._etag import _not_modified
+from ..._responses import FastJSONResponse
+from ..._sparse_fieldsets import _parse_fields
+from ..._sparse_fieldsets import _select_columns
+from ..._sparse_fieldsets import _serialize_fields
+from ..._streaming import _accepts_ndjson
+from ..._streaming import _stream_ndjson
 from ....schemas import ProjectCreate
 from ....schemas import ProjectRead
 from ....schemas import ProjectUpdate
+from ....security import AuthUser
 from ....security import current_active_user
-from ....security import User
-from ._aux_functions import _check_project_exists
+from ....security import current_active_user_readonly
+from ._aux_functions import _check_project_name_conflict
+from ._aux_functions import _check_project_names_available
+from ._aux_functions import _check_projects_owner
+from ._aux_functions import _escape_like
 from ._aux_functions import _get_project_check_owner
+from ._aux_functions import _get_project_etag
+from ._aux_functions import _get_project_fields_check_owner
+from ._aux_functions import _get_project_list_etag
+from ._aux_functions import _get_project_name_search_clause
 
 router = APIRouter()
 
+# Maximum number of projects created or deleted by a single batch request
+_MAX_BATCH_SIZE = 10_000
+# Maximum number of projects in a page
+_MAX_PAGE_SIZE = 10_000
+# Largest value of an `INTEGER` column (on Postgres), for cursors and offsets
+_MAX_INTEGER = 2**31 - 1
+
 
 @router.get("/", response_model=list[ProjectRead])
 async def get_list_project(
-    user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_db),
-) -> list[Project]:
+    limit: Optional[int] = Query(default=None, gt=0, le=_MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(default=None, le=_MAX_INTEGER),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+    user: AuthUser = Depends(current_active_user_readonly),
+    db: AsyncSession = Depends(get_async_db_readonly),
+) -> Response:
+    """
+    Return list of projects user is member of, sorted by `id`
+
+    If `limit` is set (to at most `_MAX_PAGE_SIZE`), at most `limit` projects
+    are returned; if there are more, the `after_id` value to fetch the next
+    page is returned in the `X-Next-Cursor` header. If `fields` is set (as a
+    comma-separated list of `ProjectRead` attributes), only those attributes
+    are returned.
+
+    Unless `limit` or `after_id` are set, the response has a weak `ETag`,
+    which changes whenever any project of the user is created, updated or
+    deleted; if it matches `If-None-Match`, an empty 304 response is
+    returned. Since the representation depends on the `Accept` header, all
+    responses include `Vary: Accept`.
+
+    If the `Accept` header includes `application/x-ndjson`, projects are
+    streamed as newline-delimited JSON. In this case `X-Next-Cursor` is not
+    returned, and the next page starts after the last streamed project.
+    """
+    field_list = _parse_fields(fields, ProjectRead)
+    if field_list is None:
+        field_list = list(ProjectRead.__fields__)
+
+    headers = {"Vary": "Accept"}
+    # NOTE: the entity tag involves all the projects of the user, so it is
+    # not computed for pages, which must not cost as much as the whole list
+    if limit is None and after_id is None:
+        etag = await _get_project_list_etag(user_id=user.id, db=db)
+        if _etag_matches(if_none_match, etag):
+            await db.close()
+            return _not_modified(etag, vary="Accept")
+        headers["ETag"] = etag
+
+    # NOTE: only table columns are involved, so that projects are read as
+    # plain rows, bypassing the ORM. Sorting by `project_id` (which equals
+    # `Project.id`) lets the `(user_id, project_id)` index serve both the
+    # filter and the ordering
+    link_table = LinkUserProject.__table__  # type: ignore
+    stm = (
+        select(*_select_columns(Project, field_list), link_table.c.project_id)
+        .join_from(Project.__table__, link_table)  # type: ignore
+        .where(link_table.c.user_id == user.id)
+        .order_by(link_table.c.project_id)
+    )
+    if after_id is not None:
+        stm = stm.where(link_table.c.project_id > after_id)
+
+    if _accepts_ndjson(accept):
+        if limit is not None:
+            stm = stm.limit(limit)
+        return _stream_ndjson(
+            statement=stm, fields=field_list, db=db, headers=headers
+        )
+
+    if limit is not None:
+        # Fetch one more project, to know whether there is a next page
+        stm = stm.limit(limit + 1)
+    res = await db.execute(stm)
+    rows = res.all()
+    await db.close()
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1].project_id)
+
+    return FastJSONResponse(
+        content=[_serialize_fields(row._mapping, field_list) for row in rows],
+        headers=headers,
+    )
+
+
+@router.get("/search/", response_model=list[ProjectRead])
+async def search_project(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, gt=0, le=_MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0, le=_MAX_INTEGER),
+    fields: Optional[str] = None,
+    user: AuthUser = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db_readonly),
+) -> Response:
     """
-    Return list of projects user is member of
+    Search the projects user is member of, by name
+
+    Projects whose name includes `q` (case-insensitively) are returned,
+    ranked by relevance: names starting with `q` come first, then shorter
+    names (where `q` is a larger part of the name), then older projects.
+
+    At most `limit` projects (up to `_MAX_PAGE_SIZE`) are returned, starting
+    from `offset`; if there are more, the `offset` value to fetch the next
+    page is returned in the `X-Next-Offset` header. If `fields` is set (as a
+    comma-separated list of `ProjectRead` attributes), only those attributes
+    are returned.
     """
+    field_list = _parse_fields(fields, ProjectRead)
+    if field_list is None:
+        field_list = list(ProjectRead.__fields__)
+
+    project_table = Project.__table__  # type: ignore
+    link_table = LinkUserProject.__table__  # type: ignore
+    name_column = project_table.c.name
+    is_prefix = name_column.ilike(f"{_escape_like(q)}%", escape="\\")
     stm = (
-        select(Project)
-        .join(LinkUserProject)
-        .where(LinkUserProject.user_id == user.id)
+        select(*_select_columns(Project, field_list))
+        .join_from(project_table, link_table)
+        .where(link_table.c.user_id == user.id)
+        .where(_get_project_name_search_clause(q))
+        .order_by(
+            case((is_prefix, 0), else_=1),
+            func.length(name_column),
+            project_table.c.id,
+        )
+        .offset(offset)
+        # Fetch one more project, to know whether there is a next page
+        .limit(limit + 1)
     )
     res = await db.execute(stm)
-    project_list = res.scalars().all()
+    rows = res.all()
     await db.close()
-    return project_list
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+
+    return FastJSONResponse(
+        content=[_serialize_fields(row._mapping, field_list) for row in rows],
+        headers=headers,
+    )
+
+
+@router.delete("/", status_code=204)
+async def delete_project_batch(
+    ids: list[int] = Body(...),
+    user: AuthUser = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Delete several projects at once, in a single transaction
+
+    The project ids are passed as a JSON list in the request body, with at
+    most `_MAX_BATCH_SIZE` ids. Membership is checked for all projects with
+    a single statement, and memberships and projects are removed with
+    set-based DELETEs.
+    """
+    project_ids = list(set(ids))
+    if not project_ids:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    if len(project_ids) > _MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                f"Cannot delete more than {_MAX_BATCH_SIZE} projects at once"
+            ),
+        )
+    await _check_projects_owner(
+        project_ids=project_ids, user_id=user.id, db=db
+    )
+    await db.execute(
+        delete(LinkUserProject)
+        .where(LinkUserProject.project_id.in_(project_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(Project)
+        .where(Project.id.in_(project_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/", response_model=ProjectRead, status_code=201)
 async def create_project(
     project: ProjectCreate,
-    user: User = Depends(current_active_user),
+    user: AuthUser = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_db),
 ) -> Optional[ProjectRead]:
+    """
+    Create a project, with the current user as its only member
 
-    # Check that there is no project with the same user and name
-    await _check_project_exists(
-        project_name=project.name, user_id=user.id, db=db
+    The project and its membership are inserted by two statements, and the
+    response is built from the values returned by the first one.
+    """
+    try:
+        res = await db.execute(
+            insert(Project)
+            .values(
+                **project.dict(), timestamp_created=get_timestamp(), version=1
+            )
+            .returning(*Project.__table__.columns)  # type: ignore
+        )
+        row = res.one()
+        # NOTE: `user` belongs to the read-only session of the authentication
+        # dependency, so the membership is added through the link table
+        await db.execute(
+            insert(LinkUserProject).values(
+                project_id=row.id, user_id=user.id, project_name=row.name
+            )
+        )
+        await db.commit()
+        await db.close()
+    except IntegrityError as e:
+        await db.rollback()
+        # Check that there is no project with the same user and name
+        _check_project_name_conflict(error=e, project_name=project.name)
+        logger = set_logger("create_project")
+        logger.error(str(e))
+        close_logger(logger)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    return dict(row._mapping)
+
+
+@router.post("/batch/", response_model=list[ProjectRead], status_code=201)
+async def create_project_batch(
+    project_list: list[ProjectCreate],
+    user: AuthUser = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[Project]:
+    """
+    Create several projects at once, in a single transaction
+
+    Name uniqueness is checked for the whole batch with a single statement,
+    and projects and memberships are written with multi-row INSERTs. At most
+    `_MAX_BATCH_SIZE` projects can be created at once.
+    """
+    if not project_list:
+        return []
+    if len(project_list) > _MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                f"Cannot create more than {_MAX_BATCH_SIZE} projects at once"
+            ),
+        )
+    project_names = [project.name for project in project_list]
+    await _check_project_names_available(
+        project_names=project_names, user_id=user.id, db=db
     )
 
-    db_project = Project(**project.dict())
-    db_project.user_list.append(user)
+    timestamp_created = get_timestamp()
     try:
-        db.add(db_project)
+        res = await db.scalars(
+            insert(Project).returning(Project, sort_by_parameter_order=True),
+            [
+                dict(
+                    **project.dict(),
+                    timestamp_created=timestamp_created,
+                    version=1,
+                )
+                for project in project_list
+            ],
+        )
+        db_project_list = res.all()
+        await db.execute(
+            insert(LinkUserProject),
+            [
+                dict(
+                    project_id=db_project.id,
+                    user_id=user.id,
+                    project_name=db_project.name,
+                )
+                for db_project in db_project_list
+            ],
+        )
         await db.commit()
-        await db.refresh(db_project)
         await db.close()
     except IntegrityError as e:
         await db.rollback()
-        logger = set_logger("create_project")
+        # Another request may have used some of these names in the meantime
+        await _check_project_names_available(
+            project_names=project_names, user_id=user.id, db=db
+        )
+        logger = set_logger("create_project_batch")
         logger.error(str(e))
         close_logger(logger)
         raise HTTPException(
@@ -77,53 +357,124 @@ async def create_project(
             detail=str(e),
         )
 
-    return db_project
+    return db_project_list
 
 
 @router.get("/{project_id}/", response_model=ProjectRead)
 async def read_project(
     project_id: int,
-    user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_db),
-) -> Optional[ProjectRead]:
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    user: AuthUser = Depends(current_active_user_readonly),
+    db: AsyncSession = Depends(get_async_db_readonly),
+) -> Response:
+    """
+    Return a project user is member of
 
-    project = await _get_project_check_owner(
-        project_id=project_id, user_id=user.id, db=db
+    If `fields` is set (as a comma-separated list of `ProjectRead`
+    attributes), only those attributes are returned.
+
+    The response has a strong `ETag`, based on the version of the project;
+    if it matches `If-None-Match`, an empty 304 response is returned.
+    """
+    field_list = _parse_fields(fields, ProjectRead)
+    if field_list is None:
+        field_list = list(ProjectRead.__fields__)
+    project_fields = await _get_project_fields_check_owner(
+        project_id=project_id,
+        user_id=user.id,
+        fields=[*field_list, "version"],
+        db=db,
     )
     await db.close()
-    return project
+    etag = _get_project_etag(
+        project_id=project_id, version=project_fields["version"]
+    )
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    return FastJSONResponse(
+        content=_serialize_fields(project_fields, field_list),
+        headers={"ETag": etag},
+    )
 
 
 @router.patch("/{project_id}/", response_model=ProjectRead)
 async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
-    user: User = Depends(current_active_user),
+    user: AuthUser = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_db),
 ):
-    project = await _get_project_check_owner(
-        project_id=project_id, user_id=user.id, db=db
-    )
+    """
+    Update a project user is member of
 
-    # Check that there is no project with the same user and name
-    if project_update.name is not None:
-        await _check_project_exists(
-            project_name=project_update.name, user_id=user.id, db=db
+    The membership check and the update are performed by a single
+    `UPDATE ... RETURNING` statement (plus one for the denormalized name of
+    the memberships, when renaming); the project is only looked up to tell
+    404 and 403 apart, if no row was updated.
+    """
+    update_dict = project_update.dict(exclude_unset=True)
+    if not update_dict:
+        project = await _get_project_check_owner(
+            project_id=project_id, user_id=user.id, db=db
         )
+        await db.close()
+        return project
 
-    for key, value in project_update.dict(exclude_unset=True).items():
-        setattr(project, key, value)
-
-    await db.commit()
-    await db.refresh(project)
+    # NOTE: `version` must be incremented explicitly, since this statement
+    # does not go through the unit of work
+    stm = (
+        update(Project)
+        .where(Project.id == project_id)
+        .where(
+            select(LinkUserProject)
+            .where(LinkUserProject.project_id == Project.id)
+            .where(LinkUserProject.user_id == user.id)
+            .exists()
+        )
+        .values(**update_dict, version=Project.version + 1)
+        .returning(*Project.__table__.columns)  # type: ignore
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        res = await db.execute(stm)
+        row = res.first()
+        if row is None:
+            # Raise either 404 or 403
+            await _get_project_check_owner(
+                project_id=project_id, user_id=user.id, db=db
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found",
+            )
+        if "name" in update_dict:
+            await db.execute(
+                update(LinkUserProject)
+                .where(LinkUserProject.project_id == project_id)
+                .values(project_name=row.name)
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # Check that there is no project with the same user and name
+        _check_project_name_conflict(error=e, project_name=project_update.name)
+        logger = set_logger("update_project")
+        logger.error(str(e))
+        close_logger(logger)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
     await db.close()
-    return project
+    return dict(row._mapping)
 
 
 @router.delete("/{project_id}/", status_code=204)
 async def delete_project(
     project_id: int,
-    user: User = Depends(current_active_user),
+    user: AuthUser = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_db),
 ) -> Response:
 
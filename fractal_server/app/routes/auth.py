@@ -1,8 +1,11 @@
 """
 Definition of `/auth` routes.
 """
+from typing import Optional
+
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
 from fastapi import HTTPException
 from fastapi import status
 from fastapi_users import exceptions
@@ -13,19 +16,28 @@ from sqlmodel import select
 
 from ...config import get_settings
 from ...syringe import Inject
-from ..db import get_async_db
+from ..db import get_async_db_readonly
 from ..models.security import UserOAuth as User
 from ..schemas.user import UserCreate
 from ..schemas.user import UserRead
 from ..schemas.user import UserUpdate
 from ..schemas.user import UserUpdateStrict
+from ..security import AuthUser
 from ..security import cookie_backend
 from ..security import current_active_superuser
+from ..security import current_active_superuser_readonly
 from ..security import current_active_user
+from ..security import current_active_user_readonly
 from ..security import fastapi_users
 from ..security import get_user_manager
 from ..security import token_backend
 from ..security import UserManager
+from ._responses import FastJSONResponse
+from ._sparse_fieldsets import _parse_fields
+from ._sparse_fieldsets import _select_columns
+from ._sparse_fieldsets import _serialize_fields
+from ._streaming import _accepts_ndjson
+from ._streaming import _stream_ndjson
 
 router_auth = APIRouter()
 
@@ -67,14 +79,17 @@ router_auth.include_router(
 @router_auth.patch("/current-user/", response_model=UserRead)
 async def patch_current_user(
     user_update: UserUpdateStrict,
-    current_user: User = Depends(current_active_user),
+    current_user: AuthUser = Depends(current_active_user),
     user_manager: UserManager = Depends(get_user_manager),
 ):
 
     update = UserUpdate(**user_update.dict(exclude_unset=True))
 
+    # `current_user` only includes the attributes needed for authentication,
+    # so we re-load the full user through `user_manager`
+    user = await user_manager.get(current_user.id)
     try:
-        user = await user_manager.update(update, current_user, safe=True)
+        user = await user_manager.update(update, user, safe=True)
     except exceptions.InvalidPasswordException as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,26 +102,60 @@ async def patch_current_user(
 
 
 @router_auth.get("/current-user/", response_model=UserRead)
-async def get_current_user(user: User = Depends(current_active_user)):
+async def get_current_user(
+    fields: Optional[str] = None,
+    current_user: AuthUser = Depends(current_active_user_readonly),
+    db: AsyncSession = Depends(get_async_db_readonly),
+):
     """
     Return current user
+
+    If `fields` is set (as a comma-separated list of `UserRead` attributes),
+    only those attributes are returned.
     """
-    return user
+    field_list = _parse_fields(fields, UserRead)
+    if field_list is None:
+        field_list = list(UserRead.__fields__)
+    # `current_user` only includes the attributes needed for authentication
+    stm = select(*(getattr(User, field) for field in field_list)).where(
+        User.id == current_user.id
+    )
+    res = await db.execute(stm)
+    row = res.one()
+    await db.close()
+    return FastJSONResponse(
+        content=_serialize_fields(row._mapping, field_list)
+    )
 
 
 @router_auth.get("/users/", response_model=list[UserRead])
 async def list_users(
-    user: User = Depends(current_active_superuser),
-    db: AsyncSession = Depends(get_async_db),
+    fields: Optional[str] = None,
+    accept: Optional[str] = Header(default=None),
+    user: AuthUser = Depends(current_active_superuser_readonly),
+    db: AsyncSession = Depends(get_async_db_readonly),
 ):
     """
     Return list of all users
+
+    If `fields` is set (as a comma-separated list of `UserRead` attributes),
+    only those attributes are returned. If the `Accept` header includes
+    `application/x-ndjson`, users are streamed as newline-delimited JSON.
     """
-    stm = select(User)
+    field_list = _parse_fields(fields, UserRead)
+    if field_list is None:
+        field_list = list(UserRead.__fields__)
+    # NOTE: users are read as plain rows, bypassing the ORM
+    user_table = User.__table__  # type: ignore
+    stm = select(*_select_columns(User, field_list)).order_by(user_table.c.id)
+    if _accepts_ndjson(accept):
+        return _stream_ndjson(statement=stm, fields=field_list, db=db)
     res = await db.execute(stm)
-    user_list = res.scalars().unique().all()
+    rows = res.all()
     await db.close()
-    return user_list
+    return FastJSONResponse(
+        content=[_serialize_fields(row._mapping, field_list) for row in rows]
+    )
 
 
 # OAUTH CLIENTS
@@ -1,6 +1,4 @@
 import os
-from datetime import datetime
-from datetime import timezone
 
 
 def valstr(attribute: str, accept_none: bool = False):
@@ -56,16 +54,3 @@ def val_unique_list(attribute: str):
         return must_be_unique
 
     return val
-
-
-def valutc(attribute: str):
-    def val(timestamp: datetime):
-        """
-        Replacing `tzinfo` with `timezone.utc` is just required by SQLite data.
-        If using Postgres, this function leaves the datetime exactly as it is.
-        """
-        if timestamp is not None:
-            return timestamp.replace(tzinfo=timezone.utc)
-        return None
-
-    return val
@@ -27,6 +27,8 @@ registers the client and the relative routes.
 All routes are registerd under the `auth/` prefix.
 """
 import contextlib
+from dataclasses import dataclass
+from dataclasses import fields
 from typing import Any
 from typing import AsyncGenerator
 from typing import Dict
@@ -57,6 +59,7 @@ from sqlmodel import select
 from ...config import get_settings
 from ...syringe import Inject
 from ..db import get_async_db
+from ..db import get_async_db_readonly
 from ..models.security import OAuthAccount
 from ..models.security import UserOAuth as User
 from fractal_server.app.models.security import UserOAuth
@@ -117,7 +120,11 @@ class SQLModelUserDatabaseAsync(Generic[UP, ID], BaseUserDatabase[UP, ID]):
             select(self.oauth_account_model)
             .where(self.oauth_account_model.oauth_name == oauth)
             .where(self.oauth_account_model.account_id == account_id)
-            .options(selectinload(self.oauth_account_model.user))  # type: ignore  # noqa
+            .options(
+                selectinload(self.oauth_account_model.user).selectinload(  # type: ignore  # noqa
+                    self.user_model.oauth_accounts  # type: ignore
+                )
+            )
         )
         results = await self.session.execute(statement)
         oauth_account = results.first()
@@ -152,6 +159,8 @@ class SQLModelUserDatabaseAsync(Generic[UP, ID], BaseUserDatabase[UP, ID]):
         if self.oauth_account_model is None:
             raise NotImplementedError()
 
+        # `oauth_accounts` is not loaded by default
+        await self.session.refresh(user, ["oauth_accounts"])
         oauth_account = self.oauth_account_model(**create_dict)
         user.oauth_accounts.append(oauth_account)  # type: ignore
         self.session.add(user)
@@ -174,12 +183,61 @@ class SQLModelUserDatabaseAsync(Generic[UP, ID], BaseUserDatabase[UP, ID]):
         return user
 
 
+@dataclass(frozen=True)
+class AuthUser:
+    """
+    Lightweight, immutable projection of `UserOAuth`, returned by the
+    current-user dependencies.
+
+    It only includes the attributes needed to authenticate and authorize a
+    request; endpoints that need the full user must load it by `id`.
+    """
+
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+
+
+class SQLModelAuthUserDatabaseAsync(SQLModelUserDatabaseAsync[UP, ID]):
+    """
+    Database adapter for the current-user dependencies, whose `get` method
+    only selects the columns of `AuthUser`.
+    """
+
+    async def get(self, id: ID) -> Optional[AuthUser]:  # type: ignore
+        """Get the `AuthUser` projection of a single user by id."""
+        statement = select(
+            *(getattr(self.user_model, f.name) for f in fields(AuthUser))
+        ).where(
+            self.user_model.id == id  # type: ignore
+        )
+        results = await self.session.execute(statement)
+        row = results.first()
+        if row is None:
+            return None
+        return AuthUser(**row._mapping)
+
+
 async def get_user_db(
     session: AsyncSession = Depends(get_async_db),
 ) -> AsyncGenerator[SQLModelUserDatabaseAsync, None]:
     yield SQLModelUserDatabaseAsync(session, User, OAuthAccount)
 
 
+async def get_auth_user_db(
+    session: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[SQLModelAuthUserDatabaseAsync, None]:
+    yield SQLModelAuthUserDatabaseAsync(session, User, OAuthAccount)
+
+
+async def get_user_db_readonly(
+    session: AsyncSession = Depends(get_async_db_readonly),
+) -> AsyncGenerator[SQLModelAuthUserDatabaseAsync, None]:
+    yield SQLModelAuthUserDatabaseAsync(session, User, OAuthAccount)
+
+
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def validate_password(self, password: str, user: User) -> None:
         # check password length
@@ -200,6 +258,18 @@ async def get_user_manager(
     yield UserManager(user_db)
 
 
+async def get_auth_user_manager(
+    user_db: SQLModelAuthUserDatabaseAsync = Depends(get_auth_user_db),
+) -> AsyncGenerator[UserManager, None]:
+    yield UserManager(user_db)
+
+
+async def get_user_manager_readonly(
+    user_db: SQLModelAuthUserDatabaseAsync = Depends(get_user_db_readonly),
+) -> AsyncGenerator[UserManager, None]:
+    yield UserManager(user_db)
+
+
 bearer_transport = BearerTransport(tokenUrl="/auth/token/login")
 cookie_transport = CookieTransport(cookie_samesite="none")
 
@@ -236,14 +306,32 @@ fastapi_users = FastAPIUsers[User, int](
     get_user_manager,
     [token_backend, cookie_backend],
 )
+# NOTE: the current-user dependencies only select the columns needed for
+# authentication, and return an `AuthUser` rather than the ORM object:
+# endpoints that need the full user must re-load it by `id`.
+fastapi_users_auth = FastAPIUsers[User, int](
+    get_auth_user_manager,
+    [token_backend, cookie_backend],
+)
+# NOTE: authenticating against a read replica may lag behind changes to the
+# user (e.g. a deactivation), so the `*_readonly` dependencies are only meant
+# for read-only endpoints.
+fastapi_users_readonly = FastAPIUsers[User, int](
+    get_user_manager_readonly,
+    [token_backend, cookie_backend],
+)
 
 
 # Create dependencies for users
-current_active_user = fastapi_users.current_user(active=True)
-current_active_verified_user = fastapi_users.current_user(
+current_active_user = fastapi_users_auth.current_user(active=True)
+current_active_verified_user = fastapi_users_auth.current_user(
     active=True, verified=True
 )
-current_active_superuser = fastapi_users.current_user(
+current_active_superuser = fastapi_users_auth.current_user(
+    active=True, superuser=True
+)
+current_active_user_readonly = fastapi_users_readonly.current_user(active=True)
+current_active_superuser_readonly = fastapi_users_readonly.current_user(
     active=True, superuser=True
 )
 
@@ -174,6 +174,23 @@ class Settings(BaseSettings):
     """
     If `True`, make database operations verbose.
     """
+    DB_SLOW_QUERY_MS: Optional[float] = Field(1000.0, ge=0)
+    """
+    Statements that take longer than this threshold (in milliseconds) are
+    logged as warnings, together with the route that issued them. If `None`,
+    slow statements are not logged (their statistics are still collected).
+    """
+    DB_REQUEST_QUERY_BUDGET: Optional[int] = Field(20, ge=0)
+    """
+    A warning is logged for every request that executes more SQL statements
+    than this budget. If `None`, no warning is logged.
+    """
+    DB_REPEATED_QUERY_THRESHOLD: Optional[int] = Field(10, ge=1)
+    """
+    A warning is logged for every request that executes the same statement
+    (up to its parameters) more than this number of times, as this is
+    typical of N+1 query patterns. If `None`, no warning is logged.
+    """
     POSTGRES_USER: Optional[str]
     """
     User to use when connecting to the PostgreSQL database.
@@ -194,11 +211,111 @@ class Settings(BaseSettings):
     """
     Name of the PostgreSQL database to connect to.
     """
+    POSTGRES_READONLY_HOST: Optional[str]
+    """
+    URL to a read-only replica of the PostgreSQL server (or path to its UNIX
+    domain socket). If set, read-only requests are served by the replica.
+    """
+    POSTGRES_READONLY_PORT: Optional[str]
+    """
+    Port number of the read-only replica (defaults to `POSTGRES_PORT`).
+    """
 
     SQLITE_PATH: Optional[str]
     """
     File path where the SQLite database is located (or will be located).
     """
+    SQLITE_READONLY_PATH: Optional[str]
+    """
+    File path of a read-only replica of the SQLite database. If set,
+    read-only requests are served by the replica.
+    """
+
+    SQLITE_JOURNAL_MODE: Literal[
+        "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"
+    ] = "WAL"
+    """
+    SQLite
+    [`journal_mode`](https://www.sqlite.org/pragma.html#pragma_journal_mode);
+    with `WAL`, readers do not block writers and vice versa.
+    """
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    """
+    SQLite
+    [`synchronous`](https://www.sqlite.org/pragma.html#pragma_synchronous)
+    flag; `NORMAL` is safe from corruption when `SQLITE_JOURNAL_MODE=WAL`.
+    """
+    SQLITE_CACHE_SIZE: int = -64000
+    """
+    SQLite [`cache_size`](https://www.sqlite.org/pragma.html#pragma_cache_size)
+    per connection; negative values are in KiB, positive ones in pages.
+    """
+    SQLITE_MMAP_SIZE: int = Field(0, ge=0)
+    """
+    SQLite [`mmap_size`](https://www.sqlite.org/pragma.html#pragma_mmap_size),
+    in bytes; `0` disables memory-mapped I/O.
+    """
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    """
+    SQLite [`temp_store`](https://www.sqlite.org/pragma.html#pragma_temp_store)
+    location for temporary tables and indices.
+    """
+    SQLITE_BUSY_TIMEOUT: int = Field(5000, ge=0)
+    """
+    SQLite
+    [`busy_timeout`](https://www.sqlite.org/pragma.html#pragma_busy_timeout),
+    in milliseconds: how long a connection waits for a lock to be released.
+    """
+    SQLITE_FOREIGN_KEYS: bool = True
+    """
+    If `True`, enforce SQLite
+    [foreign-key constraints](https://www.sqlite.org/foreignkeys.html).
+    """
+    SQLITE_READ_POOL_SIZE: int = Field(0, ge=0)
+    """
+    If positive, serve read-only requests from a pool of this many read-only
+    SQLite connections, and funnel all other sessions through a single
+    writer connection (sessions wait in a queue for it, for at most
+    `DB_POOL_TIMEOUT` seconds). If `0`, all sessions share a single
+    connection. Best used together with `SQLITE_JOURNAL_MODE=WAL`, so that
+    readers are not blocked by the writer.
+    """
+
+    DB_POOL_SIZE: int = Field(5, ge=1)
+    """
+    Number of connections kept open in the async connection pool (only used
+    when `DB_ENGINE=postgres`).
+    """
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)
+    """
+    Number of connections that can be opened on top of `DB_POOL_SIZE` when
+    all pooled connections are in use (only used when `DB_ENGINE=postgres`).
+    """
+    DB_POOL_TIMEOUT: float = Field(30.0, gt=0)
+    """
+    Seconds to wait for a connection to become available before giving up.
+    With `DB_ENGINE=sqlite`, this is only used when
+    `SQLITE_READ_POOL_SIZE>0`, as the wait for the single writer connection
+    and for the connections of the read pool.
+    """
+    DB_POOL_RECYCLE: int = -1
+    """
+    Seconds after which a pooled connection is replaced by a new one; `-1`
+    means that connections are never recycled (only used when
+    `DB_ENGINE=postgres`).
+    """
+    DB_POOL_PRE_PING: bool = True
+    """
+    If `True`, test connections for liveness upon checkout (only used when
+    `DB_ENGINE=postgres`).
+    """
+    DB_POOL_USE_LIFO: bool = False
+    """
+    If `True`, reuse the most recently returned connection first (LIFO)
+    instead of the least recently used one (FIFO), so that idle connections
+    can be closed by the server-side timeout (only used when
+    `DB_ENGINE=postgres`).
+    """
 
     @property
     def DATABASE_URL(self) -> URL:
@@ -224,6 +341,25 @@ class Settings(BaseSettings):
             )
             return url
 
+    @property
+    def DATABASE_READONLY_URL(self) -> Optional[URL]:
+        """
+        URL of the read-only replica, or `None` if no replica is configured.
+        """
+        if self.DB_ENGINE == "sqlite":
+            if not self.SQLITE_READONLY_PATH:
+                return None
+            return self.DATABASE_URL.set(
+                database=abspath(self.SQLITE_READONLY_PATH)
+            )
+        elif self.DB_ENGINE == "postgres":
+            if not self.POSTGRES_READONLY_HOST:
+                return None
+            return self.DATABASE_URL.set(
+                host=self.POSTGRES_READONLY_HOST,
+                port=self.POSTGRES_READONLY_PORT or self.POSTGRES_PORT,
+            )
+
     @property
     def DATABASE_SYNC_URL(self):
         if self.DB_ENGINE == "sqlite":
@@ -348,6 +484,26 @@ class Settings(BaseSettings):
     Default values correspond to `vite` defaults.
     """
 
+    FRACTAL_COMPRESSION_MINIMUM_SIZE: Optional[int] = Field(1024, ge=0)
+    """
+    Responses smaller than this size (in bytes) are not compressed; streaming
+    responses are always compressed. If `None`, responses are never
+    compressed.
+    """
+
+    FRACTAL_COMPRESSION_CONTENT_TYPES: str = (
+        "application/json;application/x-ndjson;text/html;text/plain"
+    )
+    """
+    Semicolon-separated list of the content types of compressed responses.
+    """
+
+    FRACTAL_COMPRESSION_LEVEL: int = Field(5, ge=1, le=9)
+    """
+    Compression level (from 1, fastest, to 9, smallest), used for all of
+    gzip, brotli and zstd.
+    """
+
     ###########################################################################
     # BUSINESS LOGIC
     ###########################################################################
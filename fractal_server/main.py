@@ -18,6 +18,8 @@ This module sets up the FastAPI application that serves the Fractal Server.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .app.compression import CompressionMiddleware
+from .app.db import DBStatsMiddleware
 from .app.security import _create_first_user
 from .config import get_settings
 from .syringe import Inject
@@ -31,6 +33,7 @@ def collect_routers(app: FastAPI) -> None:
         app:
             The application to register the routers to.
     """
+    from .app.routes.admin import router_admin
     from .app.routes.api import router_api
     from .app.routes.api.v1 import router_api_v1
     from .app.routes.auth import router_auth
@@ -38,6 +41,7 @@ def collect_routers(app: FastAPI) -> None:
     app.include_router(router_api, prefix="/api")
     app.include_router(router_api_v1, prefix="/api/v1")
     app.include_router(router_auth, prefix="/auth", tags=["auth"])
+    app.include_router(router_admin, prefix="/admin", tags=["Admin area"])
 
 
 def check_settings() -> None:
@@ -72,6 +76,8 @@ def start_application() -> FastAPI:
 
     1. Collect all available routers
     2. Set-up CORS middleware
+    3. Set-up response compression middleware
+    4. Set-up middleware reporting database usage
 
     Returns:
         app:
@@ -90,9 +96,19 @@ def start_application() -> FastAPI:
             "Content-Type",
             "Access-Control-Allow-Headers",
             "X-Requested-With",
+            "If-None-Match",
         ],
         allow_credentials=True,
+        expose_headers=[
+            "X-DB-Queries",
+            "Server-Timing",
+            "X-Next-Cursor",
+            "ETag",
+            "X-Next-Offset",
+        ],
     )
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(DBStatsMiddleware)
 
     return app
 
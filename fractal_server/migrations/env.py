@@ -33,6 +33,19 @@ target_metadata.naming_convention = {
     "pk": "pk_%(table_name)s",
 }
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Exclude the objects for the full-text search of project names, which are
+    created by raw DDL and are not part of the metadata.
+    """
+    if type_ == "table":
+        return name != "project_fts" and not name.startswith("project_fts_")
+    if type_ == "index":
+        return name != "ix_project_name_trgm"
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -59,6 +72,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -66,10 +80,19 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
+    if connection.dialect.name == "sqlite":
+        # NOTE: batch operations on SQLite copy, drop and re-create tables,
+        # which fails (or cascades deletions) when foreign keys are enforced,
+        # whatever the value of `SQLITE_FOREIGN_KEYS`. The pragma must be set
+        # outside of a transaction, hence the commit.
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.commit()
+
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
         render_as_batch=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,71 @@
+"""project name search
+
+Revision ID: f3b8a2d6c914
+Revises: d1a4c6e83f57
+Create Date: 2026-10-16 23:02:37.418260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8a2d6c914'
+down_revision = 'd1a4c6e83f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # FTS5 table indexing `project.name` (with the trigram tokenizer, for
+        # substring matches), kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE project_fts USING fts5("
+            "name, content='project', content_rowid='id', "
+            "tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN "
+            "INSERT INTO project_fts(rowid, name) VALUES (new.id, new.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN "
+            "INSERT INTO project_fts(project_fts, rowid, name) "
+            "VALUES ('delete', old.id, old.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER project_fts_au AFTER UPDATE OF name ON project "
+            "BEGIN "
+            "INSERT INTO project_fts(project_fts, rowid, name) "
+            "VALUES ('delete', old.id, old.name); "
+            "INSERT INTO project_fts(rowid, name) VALUES (new.id, new.name); "
+            "END"
+        )
+        # Index existing projects
+        op.execute("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_project_name_trgm",
+            "project",
+            ["name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS project_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS project_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS project_fts_ai")
+        op.execute("DROP TABLE IF EXISTS project_fts")
+    elif dialect == "postgresql":
+        op.drop_index("ix_project_name_trgm", table_name="project")
@@ -299,3 +299,27 @@ def test_collect_oauth_clients(monkeypatch):
         assert len(settings.OAUTH_CLIENTS_CONFIG) == 2
         names = set(c.CLIENT_NAME for c in settings.OAUTH_CLIENTS_CONFIG)
         assert names == {"GITHUB", "MYCLIENT"}
+
+
+def test_DATABASE_READONLY_URL():
+    settings = Settings(DB_ENGINE="sqlite", SQLITE_PATH="/tmp/db.db")
+    assert settings.DATABASE_READONLY_URL is None
+    settings.SQLITE_READONLY_PATH = "/tmp/replica.db"
+    assert settings.DATABASE_READONLY_URL.database == "/tmp/replica.db"
+    assert settings.DATABASE_READONLY_URL.drivername == "sqlite+aiosqlite"
+
+    settings = Settings(
+        DB_ENGINE="postgres",
+        POSTGRES_DB="fractal",
+        POSTGRES_HOST="primary",
+        POSTGRES_PORT="5433",
+    )
+    assert settings.DATABASE_READONLY_URL is None
+    settings.POSTGRES_READONLY_HOST = "replica"
+    url = settings.DATABASE_READONLY_URL
+    debug(url)
+    assert url.host == "replica"
+    assert str(url.port) == "5433"
+    assert url.database == "fractal"
+    settings.POSTGRES_READONLY_PORT = "6000"
+    assert str(settings.DATABASE_READONLY_URL.port) == "6000"
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+from devtools import debug
+
+from fractal_server.app.routes import _responses
+from fractal_server.app.routes._responses import _dumps
+from fractal_server.app.routes._responses import FastJSONResponse
+
+
+TIMESTAMP = datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc)
+CONTENT = [
+    dict(
+        id=1,
+        name="prøject",
+        read_only=False,
+        timestamp_created=TIMESTAMP,
+        slurm_accounts=["a", "b"],
+        cache_dir=None,
+    )
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps(use_orjson, monkeypatch):
+    """
+    GIVEN rows including `datetime`s and non-ASCII strings
+    WHEN they are serialized, with or without orjson
+    THEN the output is the same compact JSON
+    """
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(_responses, "orjson", None)
+
+    body = _dumps(CONTENT)
+    debug(body)
+    assert body == (
+        '[{"id":1,"name":"prøject","read_only":false,'
+        '"timestamp_created":"2024-01-02T03:04:05.000006+00:00",'
+        '"slurm_accounts":["a","b"],"cache_dir":null}]'
+    ).encode("utf-8")
+    assert FastJSONResponse(content=CONTENT).body == body
+    assert json.loads(body)[0]["name"] == "prøject"
+
+    with pytest.raises(TypeError):
+        _dumps(dict(value=object()))
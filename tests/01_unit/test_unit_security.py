@@ -1,9 +1,13 @@
 import logging
+from dataclasses import FrozenInstanceError
 
+import pytest
 from sqlmodel import select
 
 from fractal_server.app.models.security import UserOAuth
 from fractal_server.app.security import _create_first_user
+from fractal_server.app.security import AuthUser
+from fractal_server.app.security import SQLModelAuthUserDatabaseAsync
 
 
 async def count_users(db):
@@ -52,3 +56,25 @@ async def test_unit_create_first_user(db, caplog):
     assert "superuser already exists, skip creation" in caplog.text
     assert await count_users(db) == 4
     caplog.clear()
+
+
+async def test_auth_user_database(db):
+    await _create_first_user(
+        email="test1@fractal.com", password="xxxx", is_superuser=True
+    )
+    res = await db.execute(select(UserOAuth))
+    user = res.scalars().one()
+
+    user_db = SQLModelAuthUserDatabaseAsync(db, UserOAuth)
+    auth_user = await user_db.get(user.id)
+    assert auth_user == AuthUser(
+        id=user.id,
+        email="test1@fractal.com",
+        is_active=True,
+        is_superuser=True,
+        is_verified=False,
+    )
+    with pytest.raises(FrozenInstanceError):
+        auth_user.is_superuser = False
+
+    assert await user_db.get(user.id + 1) is None
@@ -112,3 +112,183 @@ def test_DB_class_sync():
 
     assert DB._engine_sync
     assert DB._sync_session_maker
+
+
+@pytest.mark.skipif(DB_ENGINE != "sqlite", reason="Only relevant for SQLite")
+async def test_sqlite_pragmas(db, db_sync, override_settings_factory):
+    """
+    Check that the SQLite tuning profile is applied to both the async and the
+    sync engines.
+    """
+    from sqlalchemy import text
+
+    expected = {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "temp_store": 2,  # MEMORY
+        "busy_timeout": 5000,
+        "foreign_keys": 1,
+    }
+    for pragma, value in expected.items():
+        res = await db.execute(text(f"PRAGMA {pragma}"))
+        assert res.scalar() == value
+        res = db_sync.execute(text(f"PRAGMA {pragma}"))
+        assert res.scalar() == value
+
+    # Custom profile
+    override_settings_factory(
+        SQLITE_SYNCHRONOUS="FULL",
+        SQLITE_CACHE_SIZE=-1000,
+        SQLITE_FOREIGN_KEYS=False,
+    )
+    DB.set_async_db()
+    async for session in DB.get_async_db():
+        res = await session.execute(text("PRAGMA synchronous"))
+        assert res.scalar() == 2  # FULL
+        res = await session.execute(text("PRAGMA cache_size"))
+        assert res.scalar() == -1000
+        res = await session.execute(text("PRAGMA foreign_keys"))
+        assert res.scalar() == 0
+    await DB.engine_async().dispose()
+
+
+@pytest.mark.skipif(DB_ENGINE != "sqlite", reason="Only relevant for SQLite")
+async def test_sqlite_read_pool(db_create_tables, override_settings_factory):
+    """
+    GIVEN SQLITE_READ_POOL_SIZE>0
+    WHEN sessions are opened
+    THEN read-only sessions use several read-only connections, and all other
+        sessions share a single writer connection
+    """
+    import asyncio
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import select
+    from fractal_server.app.models import Project
+
+    override_settings_factory(SQLITE_READ_POOL_SIZE=2, DB_POOL_TIMEOUT=1)
+    DB.set_async_db()
+    engine_readonly = DB.engine_async_readonly()
+    assert engine_readonly is not None
+    assert engine_readonly.sync_engine.pool.size() == 2
+    assert DB.engine_async().sync_engine.pool.size() == 1
+
+    # Write through the writer session
+    async for db in DB.get_async_db():
+        db.add(Project(name="myproject"))
+        await db.commit()
+
+    # Concurrent read-only sessions, each with its own connection
+    async def _read():
+        async for db_readonly in DB.get_async_db_readonly():
+            res = await db_readonly.execute(select(Project))
+            project_list = res.scalars().all()
+            checked_out = engine_readonly.sync_engine.pool.checkedout()
+            await asyncio.sleep(0.1)
+            return len(project_list), checked_out
+
+    results = await asyncio.gather(_read(), _read())
+    debug(results)
+    assert all(n_projects == 1 for n_projects, _ in results)
+    assert max(checked_out for _, checked_out in results) == 2
+
+    # Read-only connections cannot write
+    async for db_readonly in DB.get_async_db_readonly():
+        res = await db_readonly.execute(text("PRAGMA query_only"))
+        assert res.scalar() == 1
+        with pytest.raises(OperationalError):
+            await db_readonly.execute(
+                text("INSERT INTO project (name) VALUES ('x')")
+            )
+
+    await engine_readonly.dispose()
+    await DB.engine_async().dispose()
+
+
+@pytest.mark.skipif(DB_ENGINE != "sqlite", reason="Only relevant for SQLite")
+async def test_readonly_replica(
+    db_create_tables, override_settings_factory, tmp_path
+):
+    """
+    GIVEN a read-only replica (a second SQLite file, never synchronized)
+    WHEN reading through a read-only session
+    THEN the replica is used, unless the current request has written to the
+        primary database
+    """
+    from sqlalchemy import create_engine
+    from sqlmodel import select
+    from sqlmodel import SQLModel
+    from fractal_server.app.db._context import _request_db_state
+    from fractal_server.app.db._context import RequestDBState
+    from fractal_server.app.models import Project
+
+    replica_path = (tmp_path / "replica.db").as_posix()
+    engine_replica = create_engine(f"sqlite:///{replica_path}")
+    SQLModel.metadata.create_all(engine_replica)
+    engine_replica.dispose()
+
+    override_settings_factory(SQLITE_READONLY_PATH=replica_path)
+    DB.set_async_db()
+    engine_readonly = DB.engine_async_readonly()
+    assert engine_readonly.url.database == replica_path
+
+    async def _count_projects():
+        async for db_readonly in DB.get_async_db_readonly():
+            res = await db_readonly.execute(select(Project))
+            return len(res.scalars().all())
+
+    token = _request_db_state.set(RequestDBState())
+    try:
+        assert await _count_projects() == 0
+
+        # Write to the primary database, within the same request
+        async for db in DB.get_async_db():
+            db.add(Project(name="myproject"))
+            await db.commit()
+
+        # The request has written: read from the primary database
+        assert _request_db_state.get().has_written
+        assert await _count_projects() == 1
+    finally:
+        _request_db_state.reset(token)
+
+    # A new request reads from the replica again
+    token = _request_db_state.set(RequestDBState())
+    try:
+        assert await _count_projects() == 0
+    finally:
+        _request_db_state.reset(token)
+
+    await engine_readonly.dispose()
+    await DB.engine_async().dispose()
+
+
+@pytest.mark.skipif(DB_ENGINE != "sqlite", reason="Only relevant for SQLite")
+async def test_get_by_email_uses_index(db):
+    """
+    GIVEN the `ix_user_oauth_email_lower` index
+    WHEN looking up a user by email, case-insensitively
+    THEN the lookup does not scan the whole `user_oauth` table
+    """
+    from sqlalchemy import text
+    from fractal_server.app.models.security import UserOAuth
+    from fractal_server.app.security import SQLModelUserDatabaseAsync
+
+    db.add(UserOAuth(email="User@Example.org", hashed_password="xxx"))
+    await db.commit()
+
+    user_db = SQLModelUserDatabaseAsync(db, UserOAuth)
+    user = await user_db.get_by_email("user@example.ORG")
+    # `EmailStr` normalizes the domain to lowercase
+    assert user.email == "User@example.org"
+
+    res = await db.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT user_oauth.id FROM user_oauth "
+            "WHERE lower(user_oauth.email) = lower(:email)"
+        ),
+        dict(email="user@example.org"),
+    )
+    plan = " ".join(row[-1] for row in res.all())
+    debug(plan)
+    assert "ix_user_oauth_email_lower" in plan
@@ -0,0 +1,63 @@
+import pytest
+from devtools import debug
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fractal_server.app.db._pool import get_pool_status
+from fractal_server.app.db._pool import InstrumentedAsyncQueuePool
+from fractal_server.app.db._stats import LatencyHistogram
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(buckets_ms=(1, 10))
+    for value in (0.5, 1, 2, 10, 11, 1000):
+        histogram.observe(value)
+    data = histogram.dump()
+    debug(data)
+    assert histogram.count == 6
+    assert data["max_ms"] == 1000
+    assert data["buckets"] == [
+        dict(le_ms=1, count=2),
+        dict(le_ms=10, count=2),
+        dict(le_ms=None, count=2),
+    ]
+    histogram.reset()
+    assert histogram.dump()["count"] == 0
+
+
+async def test_instrumented_pool(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path.as_posix()}/pool.db",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+
+    status = get_pool_status(engine)
+    debug(status)
+    assert status["pool_class"] == "InstrumentedAsyncQueuePool"
+    assert status["pool_size"] == 1
+    assert status["checked_out"] == 0
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+        status = get_pool_status(engine)
+        assert status["checked_out"] == 1
+        assert status["idle"] == 0
+
+        # A second checkout times out, since the pool is exhausted
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+
+    status = get_pool_status(engine)
+    debug(status)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    assert status["overflow"] == 0
+    assert status["timeouts"] == 1
+    assert status["wait_time"]["count"] == 2
+
+    await engine.dispose()
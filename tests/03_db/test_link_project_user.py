@@ -9,6 +9,7 @@ async def _create_user(email, this_db):
     this_db.add(user)
     await this_db.commit()
     await this_db.refresh(user)
+    await this_db.refresh(user, ["project_list"])
     this_db.expunge(user)
     return user
 
@@ -27,7 +28,7 @@ async def test_project_user_link(app, client, MockCurrentUser, db):
     projectA = Project(name="Project A")
     db.add(projectA)
     await db.commit()
-    await db.refresh(projectA)
+    await db.refresh(projectA, ["user_list"])
     debug(projectA)
     assert len(projectA.user_list) == 0
 
@@ -79,7 +80,7 @@ async def test_project_user_link(app, client, MockCurrentUser, db):
     await db.delete(projectA)
     await db.delete(projectB)
     await db.commit()
-    await db.refresh(user1)
-    await db.refresh(user2)
+    await db.refresh(user1, ["project_list"])
+    await db.refresh(user2, ["project_list"])
     assert len(user1.project_list) == 0
     assert len(user2.project_list) == 0
@@ -0,0 +1,98 @@
+import logging
+
+import pytest
+from devtools import debug
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from fractal_server.app.db import DB
+from fractal_server.app.db._query_stats import fingerprint_statement
+from fractal_server.app.db._query_stats import query_stats
+from fractal_server.app.db._query_stats import QueryStats
+
+
+def test_fingerprint_statement():
+    assert (
+        fingerprint_statement(
+            "SELECT project.id \n  FROM project\nWHERE project.id IN "
+            "(?, ?, ?) AND project.name = 'x''y' LIMIT 10"
+        )
+        == "SELECT project.id FROM project WHERE project.id IN (?, ...) "
+        "AND project.name = ? LIMIT ?"
+    )
+    assert (
+        fingerprint_statement(
+            "SELECT user_oauth_1.id FROM user_oauth AS user_oauth_1 "
+            "WHERE user_oauth_1.id = $1::INTEGER"
+        )
+        == "SELECT user_oauth_1.id FROM user_oauth AS user_oauth_1 "
+        "WHERE user_oauth_1.id = ?::INTEGER"
+    )
+    assert (
+        fingerprint_statement("SELECT * FROM x WHERE a = %(a_1)s")
+        == "SELECT * FROM x WHERE a = ?"
+    )
+
+
+def test_query_stats_limits():
+    stats = QueryStats(max_statements=2)
+    stats.record("a", 1.0, 1, None)
+    stats.record("b", 3.0, None, "GET /b/")
+    stats.record("c", 1.0, 1, None)
+    stats.record("a", 5.0, 2, "GET /a/")
+    data = stats.dump()
+    debug(data)
+    assert [item["statement"] for item in data] == ["a", "b"]
+    assert data[0]["calls"] == 2
+    assert data[0]["rows"] == 3
+    assert data[0]["mean_ms"] == 3.0
+    assert data[0]["routes"] == ["GET /a/"]
+    stats.reset()
+    assert stats.dump() == []
+
+
+async def test_slow_query_log(db, override_settings_factory, caplog):
+    override_settings_factory(DB_SLOW_QUERY_MS=0)
+    DB.set_async_db()
+    query_stats.reset()
+
+    logger = logging.getLogger("fractal_server.app.db._query_stats")
+    logger.addHandler(caplog.handler)
+    try:
+        async for session in DB.get_async_db():
+            await session.execute(text("SELECT 1"))
+    finally:
+        logger.removeHandler(caplog.handler)
+    debug(caplog.text)
+    assert "Slow query" in caplog.text
+    assert "SELECT ?" in caplog.text
+    assert query_stats.dump()[0]["statement"] == "SELECT ?"
+
+    await DB.engine_async().dispose()
+
+
+async def test_failed_statements(db, override_settings_factory):
+    """
+    GIVEN an instrumented engine
+    WHEN statements fail
+    THEN they are recorded as errors, and no state is left on the connection
+    """
+    DB.set_async_db()
+    query_stats.reset()
+
+    async for session in DB.get_async_db():
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                await session.execute(text("SELECT * FROM missing_table"))
+            await session.rollback()
+        await session.execute(text("SELECT 1"))
+        connection = await session.connection()
+        assert "query_start_time" not in connection.info
+
+    data = {item["statement"]: item for item in query_stats.dump()}
+    debug(data)
+    assert data["SELECT * FROM missing_table"]["calls"] == 3
+    assert data["SELECT * FROM missing_table"]["errors"] == 3
+    assert data["SELECT ?"]["errors"] == 0
+
+    await DB.engine_async().dispose()
@@ -2,12 +2,19 @@ import datetime
 
 import pytest
 from devtools import debug
+from sqlalchemy import update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
+from fractal_server.app.db._context import _request_db_state
+from fractal_server.app.db._context import RequestDBState
+from fractal_server.app.models import LinkUserProject
 from fractal_server.app.models import Project
-from fractal_server.config import get_settings
-from fractal_server.syringe import Inject
+from fractal_server.app.models import UserOAuth
+from fractal_server.app.routes._sparse_fieldsets import _select_columns
 
 
 async def test_projects(db):
@@ -20,7 +27,9 @@ async def test_projects(db):
     await db.commit()
     db.expunge_all()
 
-    project_query = await db.execute(select(Project))
+    project_query = await db.execute(
+        select(Project).options(selectinload(Project.user_list))
+    )
     project_list = project_query.scalars().all()
 
     assert len(project_list) == 2
@@ -34,50 +43,173 @@ async def test_projects(db):
     assert project_query.scalars().one_or_none() is None
 
 
-async def test_project_name_not_unique(MockCurrentUser, db, project_factory):
+async def test_project_name_unique_per_user(
+    MockCurrentUser, db, project_factory
+):
     """
     GIVEN the fractal_server database
-    WHEN I create two projects with the same name and same user
-    THEN no exception is raised
+    WHEN I create two projects with the same name
+    THEN an exception is raised if and only if they have the same user
     """
     PROJ_NAME = "project name"
     async with MockCurrentUser() as user:
         p0 = await project_factory(user, name=PROJ_NAME)
-        p1 = await project_factory(user, name=PROJ_NAME)
+        p0_id = p0.id
+        with pytest.raises(IntegrityError):
+            await project_factory(user, name=PROJ_NAME)
+        await db.rollback()
+
+    async with MockCurrentUser() as other_user:
+        p1 = await project_factory(other_user, name=PROJ_NAME)
 
     stm = select(Project).where(Project.name == PROJ_NAME)
     res = await db.execute(stm)
     project_list = res.scalars().all()
     assert len(project_list) == 2
-    assert p0.model_dump() in [p.model_dump() for p in project_list]
-    assert p1.model_dump() in [p.model_dump() for p in project_list]
+    assert {p.id for p in project_list} == {p0_id, p1.id}
+
+    # Renaming a project also renames its memberships
+    p1.name = "new name"
+    await db.commit()
+    res = await db.execute(
+        select(LinkUserProject.project_name).where(
+            LinkUserProject.project_id == p1.id
+        )
+    )
+    assert res.scalars().all() == ["new name"]
+
+
+async def test_relationships_not_loaded(MockCurrentUser, db, project_factory):
+    """
+    GIVEN a user member of several projects
+    WHEN projects and user are loaded without loader options
+    THEN no relationship is loaded, and accessing one raises
+    """
+    async with MockCurrentUser() as user:
+        for ind in range(3):
+            await project_factory(user, name=f"project {ind}")
+    db.expunge_all()
+
+    state = RequestDBState()
+    token = _request_db_state.set(state)
+    try:
+        res = await db.execute(select(Project))
+        project_list = res.scalars().all()
+        db_user = await db.get(UserOAuth, user.id)
+    finally:
+        _request_db_state.reset(token)
+    assert len(project_list) == 3
+    assert state.n_statements == 2
+
+    with pytest.raises(InvalidRequestError):
+        project_list[0].user_list
+    with pytest.raises(InvalidRequestError):
+        db_user.project_list
+    with pytest.raises(InvalidRequestError):
+        db_user.oauth_accounts
+
+    # Relationships are loaded on demand, with a single statement each
+    state = RequestDBState()
+    token = _request_db_state.set(state)
+    try:
+        res = await db.execute(
+            select(UserOAuth)
+            .where(UserOAuth.id == user.id)
+            .options(selectinload(UserOAuth.project_list))
+            .execution_options(populate_existing=True)
+        )
+        db_user = res.scalars().one()
+    finally:
+        _request_db_state.reset(token)
+    assert len(db_user.project_list) == 3
+    assert state.n_statements == 2
+
+
+async def test_select_columns(MockCurrentUser, db, project_factory):
+    """
+    GIVEN some projects
+    WHEN they are read through their table columns
+    THEN rows are `Row`s rather than ORM instances, and nothing is added to
+        the identity map
+    """
+    async with MockCurrentUser() as user:
+        for ind in range(3):
+            await project_factory(user, name=f"project {ind}")
+    db.expunge_all()
+
+    stm = select(*_select_columns(Project, ["id", "name"])).order_by(
+        Project.__table__.c.id
+    )
+    res = await db.execute(stm)
+    rows = res.all()
+    assert [row.name for row in rows] == [f"project {ind}" for ind in range(3)]
+    assert all(isinstance(row, Row) for row in rows)
+    assert [dict(row._mapping) for row in rows] == [
+        dict(id=row.id, name=f"project {ind}") for ind, row in enumerate(rows)
+    ]
+    assert len(db.identity_map) == 0
+
+
+async def test_project_version(MockCurrentUser, db, project_factory):
+    """
+    GIVEN a project
+    WHEN it is updated through the ORM or with a Core UPDATE
+    THEN its version is incremented, and instances loaded before a Core
+        UPDATE can still be updated and deleted
+    """
+    async with MockCurrentUser() as user:
+        project = await project_factory(user)
+    assert project.version == 1
+
+    project.name = "new name"
+    await db.commit()
+    assert project.version == 2
+
+    # A Core UPDATE (as in `update_project`) makes `project` stale
+    project_table = Project.__table__
+    await db.execute(
+        update(project_table)
+        .where(project_table.c.id == project.id)
+        .values(version=project_table.c.version + 1)
+    )
+    await db.commit()
+    assert project.version == 2
+
+    project.read_only = True
+    await db.commit()
+    await db.delete(project)
+    await db.commit()
+    assert await db.get(Project, project.id) is None
 
 
 async def test_timestamp(db):
     """
-    SQLite encodes datetime objects as strings; therefore when extracting a
-    timestamp from the db, it is not timezone-aware by default.
-    Postgres, on the other hand, saves timestamps together with their timezone.
-    This test asserts this behaviour.
+    SQLite encodes datetime objects as strings, without their timezone, while
+    Postgres saves timestamps together with their timezone. This test asserts
+    that, thanks to `UTCDateTime`, timestamps are UTC-aware on both engines.
     """
     p = Project(name="project")
     assert isinstance(p.timestamp_created, datetime.datetime)
     assert p.timestamp_created.tzinfo == datetime.timezone.utc
     assert p.timestamp_created.tzname() == "UTC"
 
+    # A timestamp with a different timezone is converted to UTC
+    timestamp = datetime.datetime(
+        2024, 1, 1, 12, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+    )
+    p2 = Project(name="project 2", timestamp_created=timestamp)
+
     db.add(p)
+    db.add(p2)
     await db.commit()
     db.expunge_all()
 
-    query = await db.execute(select(Project))
-    project = query.scalars().one()
+    query = await db.execute(select(Project).order_by(Project.id))
+    project, project2 = query.scalars().all()
 
     assert isinstance(project.timestamp_created, datetime.datetime)
-
-    DB_ENGINE = Inject(get_settings).DB_ENGINE
-    if DB_ENGINE == "sqlite":
-        assert project.timestamp_created.tzinfo is None
-        assert project.timestamp_created.tzname() is None
-    else:  # postgres
-        assert project.timestamp_created.tzinfo == datetime.timezone.utc
-        assert project.timestamp_created.tzname() == "UTC"
+    assert project.timestamp_created.tzinfo == datetime.timezone.utc
+    assert project.timestamp_created.tzname() == "UTC"
+    assert project2.timestamp_created == timestamp
+    assert project2.timestamp_created.tzinfo == datetime.timezone.utc
+    assert project2.timestamp_created.hour == 10
@@ -0,0 +1,52 @@
+from devtools import debug
+
+PREFIX = "/admin"
+
+
+async def test_db_pool_status(
+    client, registered_client, registered_superuser_client
+):
+    # Anonymous user
+    res = await client.get(f"{PREFIX}/db/pool/")
+    assert res.status_code == 401
+
+    # Non-superuser user
+    res = await registered_client.get(f"{PREFIX}/db/pool/")
+    assert res.status_code == 403
+
+    # Superuser
+    res = await registered_superuser_client.get(f"{PREFIX}/db/pool/")
+    debug(res.json())
+    assert res.status_code == 200
+    assert "pool_class" in res.json()["primary"]
+    assert res.json()["readonly"] is None
+
+
+async def test_db_query_stats(client, registered_superuser_client):
+    res = await registered_superuser_client.delete(f"{PREFIX}/db/queries/")
+    assert res.status_code == 204
+
+    res = await registered_superuser_client.get("/api/v1/project/")
+    assert res.status_code == 200
+
+    res = await registered_superuser_client.get(f"{PREFIX}/db/queries/")
+    assert res.status_code == 200
+    statements = res.json()
+    debug(statements)
+    project_select = [
+        stm
+        for stm in statements
+        if stm["statement"].startswith("SELECT project.")
+    ]
+    assert len(project_select) == 1
+    assert project_select[0]["calls"] == 1
+    assert project_select[0]["routes"] == ["GET /api/v1/project/"]
+    assert project_select[0]["latency"]["count"] == 1
+
+    res = await registered_superuser_client.get(
+        f"{PREFIX}/db/queries/?limit=1"
+    )
+    assert len(res.json()) == 1
+
+    res = await client.get(f"{PREFIX}/db/queries/")
+    assert res.status_code == 401
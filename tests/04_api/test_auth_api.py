@@ -1,6 +1,10 @@
+import json
+
 import pytest
 from devtools import debug
 
+from tests.fixtures_server import DB_ENGINE
+
 PREFIX = "/auth"
 
 
@@ -26,6 +30,35 @@ async def test_get_current_user(
     assert res.json()["is_superuser"]
 
 
+async def test_get_user_fields(registered_client, registered_superuser_client):
+    res = await registered_client.get(
+        f"{PREFIX}/current-user/?fields=email,slurm_accounts"
+    )
+    assert res.status_code == 200
+    assert res.json() == dict(email="test@test.com", slurm_accounts=[])
+
+    res = await registered_superuser_client.get(f"{PREFIX}/users/?fields=id")
+    assert res.status_code == 200
+    assert all(list(user.keys()) == ["id"] for user in res.json())
+
+    res = await registered_client.get(
+        f"{PREFIX}/current-user/?fields=hashed_password"
+    )
+    assert res.status_code == 422
+
+
+async def test_list_users_ndjson(registered_superuser_client):
+    res = await registered_superuser_client.get(
+        f"{PREFIX}/users/", headers={"Accept": "application/x-ndjson"}
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    user_list = [json.loads(line) for line in res.text.splitlines()]
+    debug(user_list)
+    assert [u["email"] for u in user_list] == ["some-admin@fractal.xy"]
+    assert "hashed_password" not in user_list[0]
+
+
 async def test_register_user(registered_client, registered_superuser_client):
     """
     Test that user registration is only allowed to a superuser
@@ -408,3 +441,44 @@ async def test_MockCurrentUser_fixture(
         assert user.cache_dir == cache_dir
         assert user.username == username
         assert user.slurm_user == slurm_user
+
+
+@pytest.mark.skipif(DB_ENGINE != "sqlite", reason="Only relevant for SQLite")
+async def test_authentication_with_replica(
+    registered_client, override_settings_factory, tmp_path
+):
+    """
+    GIVEN a read-only replica (a second SQLite file, never synchronized)
+    WHEN a user who only exists on the primary database calls the API
+    THEN authentication uses the primary database, except for the read-only
+        endpoints served by the replica
+    """
+    from sqlalchemy import create_engine
+    from sqlmodel import SQLModel
+    from fractal_server.app.db import DB
+
+    replica_path = (tmp_path / "replica.db").as_posix()
+    engine_replica = create_engine(f"sqlite:///{replica_path}")
+    SQLModel.metadata.create_all(engine_replica)
+    engine_replica.dispose()
+
+    override_settings_factory(SQLITE_READONLY_PATH=replica_path)
+    DB.set_async_db()
+
+    res = await registered_client.post(
+        "/api/v1/project/", json=dict(name="project")
+    )
+    assert res.status_code == 201
+    res = await registered_client.patch(
+        f"{PREFIX}/current-user/", json=dict(cache_dir="/tmp/cache")
+    )
+    assert res.status_code == 200
+
+    # The user is not on the replica (yet)
+    res = await registered_client.get(f"{PREFIX}/current-user/")
+    assert res.status_code == 401
+    res = await registered_client.get("/api/v1/project/")
+    assert res.status_code == 401
+
+    await DB.engine_async_readonly().dispose()
+    await DB.engine_async().dispose()
@@ -0,0 +1,88 @@
+import json
+
+from devtools import debug
+
+from fractal_server.app.compression import _select_encoding
+
+PREFIX = "/api/v1"
+
+
+def test_select_encoding():
+    assert _select_encoding(None) is None
+    assert _select_encoding("identity") is None
+    assert _select_encoding("gzip") == "gzip"
+    assert _select_encoding("deflate, GZIP;q=0.5") == "gzip"
+    assert _select_encoding("gzip;q=0") is None
+    assert _select_encoding("gzip;q=invalid") is None
+    assert _select_encoding("*") is not None
+
+
+async def test_compression(
+    client, MockCurrentUser, project_factory, override_settings_factory
+):
+    async with MockCurrentUser() as user:
+        for ind in range(20):
+            await project_factory(user, name=f"project {ind}")
+
+        # Large responses are compressed
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"Accept-Encoding": "gzip"}
+        )
+        assert res.status_code == 200
+        debug(res.headers)
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in res.headers["Vary"]
+        assert len(res.json()) == 20
+
+        # Not if the client does not accept any available encoding
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"Accept-Encoding": "identity"}
+        )
+        assert "Content-Encoding" not in res.headers
+        assert len(res.json()) == 20
+
+        # Nor if they are small
+        project_id = res.json()[0]["id"]
+        res = await client.get(
+            f"{PREFIX}/project/{project_id}/",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert "Content-Encoding" not in res.headers
+        assert res.headers["ETag"].startswith('"')
+
+        # Strong entity tags of compressed responses are made weak, and still
+        # match the resource
+        override_settings_factory(FRACTAL_COMPRESSION_MINIMUM_SIZE=0)
+        res = await client.get(
+            f"{PREFIX}/project/{project_id}/",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert res.headers["Content-Encoding"] == "gzip"
+        etag = res.headers["ETag"]
+        assert etag.startswith('W/"')
+        res = await client.get(
+            f"{PREFIX}/project/{project_id}/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+        )
+        assert res.status_code == 304
+
+        # Streaming responses are compressed chunk by chunk
+        res = await client.get(
+            f"{PREFIX}/project/",
+            headers={
+                "Accept": "application/x-ndjson",
+                "Accept-Encoding": "gzip",
+            },
+        )
+        assert res.headers["Content-Encoding"] == "gzip"
+        lines = res.text.splitlines()
+        assert len(lines) == 20
+        assert json.loads(lines[0])["name"] == "project 0"
+
+        # Compression can be disabled
+        override_settings_factory(FRACTAL_COMPRESSION_MINIMUM_SIZE=None)
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "Content-Encoding" not in res.headers
+        assert len(res.json()) == 20
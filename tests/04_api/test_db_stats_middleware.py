@@ -0,0 +1,63 @@
+import logging
+
+from devtools import debug
+
+from fractal_server.app.db._context import DBStatsMiddleware
+from fractal_server.app.db._context import RequestDBState
+
+PREFIX = "/api/v1"
+
+
+async def test_db_stats_headers(client, MockCurrentUser, project_factory):
+    async with MockCurrentUser() as user:
+        for ind in range(3):
+            await project_factory(user, name=f"project {ind}")
+        res = await client.get(f"{PREFIX}/project/")
+        assert res.status_code == 200
+        debug(res.headers)
+        assert int(res.headers["X-DB-Queries"]) > 0
+        assert res.headers["Server-Timing"].startswith("db;dur=")
+        assert "round-trips" in res.headers["Server-Timing"]
+
+    # Routes that do not use the database report zero statements
+    res = await client.get("/api/alive/")
+    assert res.headers["X-DB-Queries"] == "0"
+
+
+async def test_db_stats_budget(
+    client, MockCurrentUser, override_settings_factory, caplog
+):
+    logger = logging.getLogger("fractal_server.app.db._context")
+    logger.addHandler(caplog.handler)
+    try:
+        override_settings_factory(DB_REQUEST_QUERY_BUDGET=0)
+        async with MockCurrentUser():
+            res = await client.get(f"{PREFIX}/project/")
+            assert res.status_code == 200
+    finally:
+        logger.removeHandler(caplog.handler)
+    debug(caplog.text)
+    assert "GET /api/v1/project/ executed" in caplog.text
+    assert "above the budget of 0" in caplog.text
+
+
+def test_db_stats_repeated_statement(override_settings_factory, caplog):
+    override_settings_factory(
+        DB_REQUEST_QUERY_BUDGET=None, DB_REPEATED_QUERY_THRESHOLD=2
+    )
+    state = RequestDBState(route="GET /something/")
+    for _ in range(3):
+        state.record_statement("SELECT x FROM y WHERE id = ?", 1.0)
+    state.record_statement("SELECT z FROM w", 1.0)
+    assert state.n_statements == 4
+    assert state.n_round_trips == 4
+
+    logger = logging.getLogger("fractal_server.app.db._context")
+    logger.addHandler(caplog.handler)
+    try:
+        DBStatsMiddleware._check_budget(state)
+    finally:
+        logger.removeHandler(caplog.handler)
+    debug(caplog.text)
+    assert "same statement 3 times" in caplog.text
+    assert "SELECT x FROM y WHERE id = ?" in caplog.text
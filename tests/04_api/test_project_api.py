@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from datetime import timezone
 
@@ -6,6 +7,7 @@ from devtools import debug
 from sqlmodel import select
 
 from fractal_server.app.models import Project
+from fractal_server.app.routes.api.v1 import project as project_module
 
 PREFIX = "/api/v1"
 
@@ -64,6 +66,13 @@ async def test_post_project(client, MockCurrentUser):
         assert res.status_code == 201
         debug(data)
         assert data["name"] == payload["name"]
+        assert data["read_only"] is False
+        assert (
+            datetime.fromisoformat(data["timestamp_created"]).tzinfo
+            == timezone.utc
+        )
+        # Project and membership insertions
+        assert res.headers["X-DB-Queries"] == "2"
 
         # Payload without `name`
         empty_payload = {}
@@ -93,6 +102,7 @@ async def test_patch_project_name_constraint(client, MockCurrentUser):
         # Create a first project named "name1"
         res = await client.post(f"{PREFIX}/project/", json=dict(name="name1"))
         assert res.status_code == 201
+        prj1 = res.json()
 
         # Create a second project named "name2"
         res = await client.post(f"{PREFIX}/project/", json=dict(name="name2"))
@@ -106,7 +116,25 @@ async def test_patch_project_name_constraint(client, MockCurrentUser):
         assert res.status_code == 422
         assert res.json()["detail"] == "Project name (name1) already in use"
 
+        # Other constraint violations are also reported as 422
+        res = await client.patch(
+            f"{PREFIX}/project/{prj2['id']}/", json=dict(read_only=None)
+        )
+        assert res.status_code == 422
+        res = await client.get(f"{PREFIX}/project/{prj2['id']}/")
+        assert res.json()["read_only"] is False
+
     async with MockCurrentUser():
+        # Fail in editing other users' or non-existing projects
+        res = await client.patch(
+            f"{PREFIX}/project/{prj1['id']}/", json=dict(name="name4")
+        )
+        assert res.status_code == 403
+        res = await client.patch(
+            f"{PREFIX}/project/123456/", json=dict(name="name4")
+        )
+        assert res.status_code == 404
+
         # Using another user, create a project named "name3"
         res = await client.post(f"{PREFIX}/project/", json=dict(name="name3"))
         assert res.status_code == 201
@@ -182,3 +210,412 @@ async def test_delete_project(client, MockCurrentUser):
         res = await client.get(f"{PREFIX}/project/")
         data = res.json()
         assert len(data) == 0
+
+
+async def test_project_statement_count(
+    client, MockCurrentUser, project_factory
+):
+    """
+    Relationships are not loaded implicitly, so that the number of statements
+    does not depend on the number of projects or users.
+    """
+    async with MockCurrentUser() as user:
+        for ind in range(5):
+            project = await project_factory(user, name=f"project {ind}")
+
+        # ETag and project list
+        res = await client.get(f"{PREFIX}/project/")
+        assert res.status_code == 200
+        assert len(res.json()) == 5
+        assert res.headers["X-DB-Queries"] == "2"
+
+        # Ownership check and project lookup, in a single statement
+        res = await client.get(f"{PREFIX}/project/{project.id}/")
+        assert res.status_code == 200
+        assert res.headers["X-DB-Queries"] == "1"
+
+        # Ownership check and update, in a single statement
+        res = await client.patch(
+            f"{PREFIX}/project/{project.id}/", json=dict(read_only=True)
+        )
+        assert res.status_code == 200
+        assert res.json()["read_only"]
+        assert res.headers["X-DB-Queries"] == "1"
+
+        # Renaming also updates the memberships
+        res = await client.patch(
+            f"{PREFIX}/project/{project.id}/", json=dict(name="new name")
+        )
+        assert res.status_code == 200
+        assert res.json()["name"] == "new name"
+        assert res.headers["X-DB-Queries"] == "2"
+
+
+async def test_get_project_list_pagination(
+    client, MockCurrentUser, project_factory
+):
+    async with MockCurrentUser() as user:
+        project_ids = [
+            (await project_factory(user, name=f"project {ind}")).id
+            for ind in range(5)
+        ]
+
+        # Without `limit`, all projects are returned, sorted by id
+        res = await client.get(f"{PREFIX}/project/")
+        assert res.status_code == 200
+        assert [p["id"] for p in res.json()] == project_ids
+        assert "X-Next-Cursor" not in res.headers
+
+        # Follow the cursor
+        pages = []
+        url = f"{PREFIX}/project/?limit=2"
+        while True:
+            res = await client.get(url)
+            assert res.status_code == 200
+            pages.append([p["id"] for p in res.json()])
+            cursor = res.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            url = f"{PREFIX}/project/?limit=2&after_id={cursor}"
+        debug(pages)
+        assert pages == [project_ids[:2], project_ids[2:4], project_ids[4:]]
+
+        # Exact last page
+        res = await client.get(
+            f"{PREFIX}/project/?limit=2&after_id={project_ids[2]}"
+        )
+        assert [p["id"] for p in res.json()] == project_ids[3:]
+        assert "X-Next-Cursor" not in res.headers
+
+        # Invalid limit and cursor
+        res = await client.get(f"{PREFIX}/project/?limit=0")
+        assert res.status_code == 422
+        res = await client.get(f"{PREFIX}/project/?limit={10**21}")
+        assert res.status_code == 422
+        res = await client.get(f"{PREFIX}/project/?after_id={10**21}")
+        assert res.status_code == 422
+
+
+async def test_get_project_fields(client, MockCurrentUser, project_factory):
+    async with MockCurrentUser() as user:
+        project = await project_factory(user, name="my project")
+
+        res = await client.get(f"{PREFIX}/project/?fields=id,name")
+        assert res.status_code == 200
+        assert res.json() == [dict(id=project.id, name="my project")]
+
+        res = await client.get(
+            f"{PREFIX}/project/{project.id}/?fields=name,timestamp_created"
+        )
+        assert res.status_code == 200
+        assert set(res.json().keys()) == {"name", "timestamp_created"}
+        assert (
+            datetime.fromisoformat(res.json()["timestamp_created"]).tzinfo
+            == timezone.utc
+        )
+
+        # Ownership is still checked
+        res = await client.get(f"{PREFIX}/project/123456/?fields=id")
+        assert res.status_code == 404
+
+        # Invalid fields
+        for fields in ("user_list", "id,foo", ","):
+            res = await client.get(f"{PREFIX}/project/?fields={fields}")
+            debug(res.json())
+            assert res.status_code == 422
+
+
+async def test_project_etag(client, MockCurrentUser, project_factory):
+    async with MockCurrentUser() as user:
+        project = await project_factory(user, name="project")
+        url = f"{PREFIX}/project/{project.id}/"
+
+        # Single project
+        res = await client.get(url)
+        assert res.status_code == 200
+        etag = res.headers["ETag"]
+        assert not etag.startswith("W/")
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["ETag"] == etag
+        res = await client.get(
+            f"{url}?fields=name", headers={"If-None-Match": etag}
+        )
+        assert res.status_code == 304
+
+        # Project list
+        res = await client.get(f"{PREFIX}/project/")
+        list_etag = res.headers["ETag"]
+        assert list_etag.startswith("W/")
+        assert "Accept" in res.headers["Vary"].split(", ")
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"If-None-Match": list_etag}
+        )
+        assert res.status_code == 304
+        assert "Accept" in res.headers["Vary"].split(", ")
+        assert res.headers["X-DB-Queries"] == "1"
+
+        # Pages have no entity tag
+        res = await client.get(
+            f"{PREFIX}/project/?limit=1", headers={"If-None-Match": list_etag}
+        )
+        assert res.status_code == 200
+        assert "ETag" not in res.headers
+
+        # Updating the project changes both tags
+        res = await client.patch(url, json=dict(name="new name"))
+        assert res.status_code == 200
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.headers["ETag"] != etag
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"If-None-Match": list_etag}
+        )
+        assert res.status_code == 200
+        list_etag = res.headers["ETag"]
+
+        # Creating a project changes the list tag
+        await project_factory(user, name="other project")
+        res = await client.get(
+            f"{PREFIX}/project/", headers={"If-None-Match": list_etag}
+        )
+        assert res.status_code == 200
+        assert len(res.json()) == 2
+
+
+async def test_post_project_batch(client, MockCurrentUser, monkeypatch):
+    async with MockCurrentUser():
+        res = await client.post(
+            f"{PREFIX}/project/", json=dict(name="existing")
+        )
+        assert res.status_code == 201
+
+        payload = [dict(name=f"project {ind}") for ind in range(10)]
+        payload[3]["read_only"] = True
+        res = await client.post(f"{PREFIX}/project/batch/", json=payload)
+        debug(res.json())
+        assert res.status_code == 201
+        project_list = res.json()
+        assert [p["name"] for p in project_list] == [
+            p["name"] for p in payload
+        ]
+        assert project_list[3]["read_only"]
+        assert not project_list[4]["read_only"]
+        res = await client.get(f"{PREFIX}/project/")
+        assert len(res.json()) == 11
+
+        # Repeated names within the batch
+        res = await client.post(
+            f"{PREFIX}/project/batch/",
+            json=[dict(name="a"), dict(name="b"), dict(name="a")],
+        )
+        assert res.status_code == 422
+        assert res.json()["detail"] == "Repeated project names ['a']"
+
+        # Names already in use, and nothing is created
+        res = await client.post(
+            f"{PREFIX}/project/batch/",
+            json=[dict(name="new"), dict(name="existing")],
+        )
+        assert res.status_code == 422
+        assert (
+            res.json()["detail"] == "Project names ['existing'] already in use"
+        )
+        res = await client.get(f"{PREFIX}/project/")
+        assert len(res.json()) == 11
+
+        # Empty batch
+        res = await client.post(f"{PREFIX}/project/batch/", json=[])
+        assert res.status_code == 201
+        assert res.json() == []
+
+        # Batches that are too large
+        monkeypatch.setattr(project_module, "_MAX_BATCH_SIZE", 2)
+        res = await client.post(
+            f"{PREFIX}/project/batch/",
+            json=[dict(name="x"), dict(name="y"), dict(name="z")],
+        )
+        assert res.status_code == 422
+        assert (
+            res.json()["detail"]
+            == "Cannot create more than 2 projects at once"
+        )
+
+
+async def test_delete_project_batch(
+    client, MockCurrentUser, project_factory, monkeypatch
+):
+    async with MockCurrentUser() as other_user:
+        other_project = await project_factory(other_user, name="other")
+
+    async with MockCurrentUser() as user:
+        project_ids = [
+            (await project_factory(user, name=f"project {ind}")).id
+            for ind in range(4)
+        ]
+
+        # Missing and forbidden projects, and nothing is deleted
+        res = await client.request(
+            "DELETE", f"{PREFIX}/project/", json=[project_ids[0], 123456]
+        )
+        assert res.status_code == 404
+        assert res.json()["detail"] == "Projects [123456] not found"
+        res = await client.request(
+            "DELETE",
+            f"{PREFIX}/project/",
+            json=[project_ids[0], other_project.id],
+        )
+        assert res.status_code == 403
+        assert (
+            res.json()["detail"]
+            == f"Not allowed on projects [{other_project.id}]"
+        )
+        res = await client.get(f"{PREFIX}/project/")
+        assert len(res.json()) == 4
+
+        # Delete three projects
+        res = await client.request(
+            "DELETE", f"{PREFIX}/project/", json=project_ids[1:]
+        )
+        assert res.status_code == 204
+        res = await client.get(f"{PREFIX}/project/")
+        assert [p["id"] for p in res.json()] == project_ids[:1]
+
+        # Names of deleted projects can be used again
+        res = await client.post(
+            f"{PREFIX}/project/", json=dict(name="project 1")
+        )
+        assert res.status_code == 201
+
+        # Empty and too large batches
+        res = await client.request("DELETE", f"{PREFIX}/project/", json=[])
+        assert res.status_code == 204
+        monkeypatch.setattr(project_module, "_MAX_BATCH_SIZE", 2)
+        res = await client.request(
+            "DELETE", f"{PREFIX}/project/", json=[1, 2, 3]
+        )
+        assert res.status_code == 422
+        assert (
+            res.json()["detail"]
+            == "Cannot delete more than 2 projects at once"
+        )
+
+
+async def test_get_project_list_ndjson(
+    client, MockCurrentUser, project_factory
+):
+    async with MockCurrentUser() as user:
+        project_ids = [
+            (await project_factory(user, name=f"project {ind}")).id
+            for ind in range(3)
+        ]
+        headers = {"Accept": "application/x-ndjson"}
+
+        res = await client.get(f"{PREFIX}/project/", headers=headers)
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+        assert "ETag" in res.headers
+        assert "Accept" in res.headers["Vary"].split(", ")
+        lines = res.text.splitlines()
+        debug(lines)
+        project_list = [json.loads(line) for line in lines]
+        assert [p["id"] for p in project_list] == project_ids
+        assert set(project_list[0].keys()) == {
+            "id",
+            "name",
+            "read_only",
+            "timestamp_created",
+        }
+        assert (
+            datetime.fromisoformat(project_list[0]["timestamp_created"]).tzinfo
+            == timezone.utc
+        )
+
+        res = await client.get(
+            f"{PREFIX}/project/?fields=name&limit=1&after_id={project_ids[0]}",
+            headers=headers,
+        )
+        assert res.text == '{"name":"project 1"}\n'
+
+
+async def test_search_project(client, MockCurrentUser, project_factory):
+    async with MockCurrentUser() as other_user:
+        await project_factory(other_user, name="alpha other")
+
+    async with MockCurrentUser() as user:
+        project_ids = {}
+        names = ["alpha project", "beta", "Alphabet", "my alpha", "50% off"]
+        for name in names:
+            project = await project_factory(user, name=name)
+            project_ids[name] = project.id
+
+        # Prefix matches come first, then shorter names
+        res = await client.get(f"{PREFIX}/project/search/?q=alpha")
+        assert res.status_code == 200
+        assert res.headers["X-DB-Queries"] == "1"
+        assert [p["name"] for p in res.json()] == [
+            "Alphabet",
+            "alpha project",
+            "my alpha",
+        ]
+        assert "X-Next-Offset" not in res.headers
+
+        # Short strings, wildcards and no matches
+        res = await client.get(f"{PREFIX}/project/search/?q=AL")
+        assert [p["name"] for p in res.json()] == [
+            "Alphabet",
+            "alpha project",
+            "my alpha",
+        ]
+        res = await client.get(f"{PREFIX}/project/search/?q=%25")
+        assert [p["name"] for p in res.json()] == ["50% off"]
+        res = await client.get(f"{PREFIX}/project/search/?q=gamma")
+        assert res.json() == []
+
+        # Pagination
+        res = await client.get(f"{PREFIX}/project/search/?q=alpha&limit=2")
+        assert [p["name"] for p in res.json()] == ["Alphabet", "alpha project"]
+        assert res.headers["X-Next-Offset"] == "2"
+        res = await client.get(
+            f"{PREFIX}/project/search/?q=alpha&limit=2&offset=2"
+        )
+        assert [p["name"] for p in res.json()] == ["my alpha"]
+        assert "X-Next-Offset" not in res.headers
+        res = await client.get(f"{PREFIX}/project/search/?q=alpha&limit=0")
+        assert res.status_code == 422
+        res = await client.get(
+            f"{PREFIX}/project/search/?q=alpha&limit={10**21}"
+        )
+        assert res.status_code == 422
+        res = await client.get(
+            f"{PREFIX}/project/search/?q=alpha&offset={10**21}"
+        )
+        assert res.status_code == 422
+
+        # Sparse fieldsets
+        res = await client.get(f"{PREFIX}/project/search/?q=beta&fields=id")
+        assert res.json() == [{"id": project_ids["beta"]}]
+
+        # The search index follows renames and deletions
+        res = await client.patch(
+            f"{PREFIX}/project/{project_ids['beta']}/",
+            json=dict(name="beta alpha"),
+        )
+        assert res.status_code == 200
+        res = await client.delete(
+            f"{PREFIX}/project/{project_ids['my alpha']}/"
+        )
+        assert res.status_code == 204
+        res = await client.get(f"{PREFIX}/project/search/?q=alpha")
+        assert [p["name"] for p in res.json()] == [
+            "Alphabet",
+            "alpha project",
+            "beta alpha",
+        ]
+
+        # Invalid parameters
+        res = await client.get(f"{PREFIX}/project/search/?q=")
+        assert res.status_code == 422
+        res = await client.get(f"{PREFIX}/project/search/?q=alpha&limit=0")
+        assert res.status_code == 422
@@ -1,6 +1,15 @@
+import sqlite3
+from types import SimpleNamespace
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
+from fractal_server.app.db._context import _request_db_state
+from fractal_server.app.db._context import RequestDBState
+from fractal_server.app.routes.api.v1._aux_functions import (
+    _check_project_name_conflict,
+)
 from fractal_server.app.routes.api.v1._aux_functions import (
     _get_project_check_owner,
 )
@@ -22,6 +31,18 @@ async def test_get_project_check_owner(
             project_id=project.id, user_id=user.id, db=db
         )
 
+        # Test that successful checks are memoized within the session
+        state = RequestDBState()
+        token = _request_db_state.set(state)
+        try:
+            same_project = await _get_project_check_owner(
+                project_id=project.id, user_id=user.id, db=db
+            )
+        finally:
+            _request_db_state.reset(token)
+        assert same_project.id == project.id
+        assert state.n_statements == 0
+
         # Test fail 1
         with pytest.raises(HTTPException) as err:
             await _get_project_check_owner(
@@ -38,3 +59,63 @@ async def test_get_project_check_owner(
         assert err.value.status_code == 403
         assert err.value.detail == f"Not allowed on project {other_project.id}"
 
+
+class _Psycopg2Error(Exception):
+    def __init__(self, constraint_name):
+        super().__init__("duplicate key value violates unique constraint")
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+class _AsyncpgError(Exception):
+    def __init__(self, constraint_name):
+        super().__init__("duplicate key value violates unique constraint")
+        self.constraint_name = constraint_name
+
+
+def _asyncpg_adapter_error(constraint_name) -> Exception:
+    """
+    Mimic the SQLAlchemy adapter, which wraps the asyncpg exception.
+    """
+    try:
+        try:
+            raise _AsyncpgError(constraint_name)
+        except _AsyncpgError as e:
+            raise Exception(str(e)) from e
+    except Exception as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    "orig,is_conflict",
+    [
+        (
+            sqlite3.IntegrityError(
+                "UNIQUE constraint failed: "
+                "linkuserproject.user_id, linkuserproject.project_name"
+            ),
+            True,
+        ),
+        (
+            sqlite3.IntegrityError(
+                "NOT NULL constraint failed: linkuserproject.project_name"
+            ),
+            False,
+        ),
+        (_Psycopg2Error("uq_linkuserproject_user_id_project_name"), True),
+        (_Psycopg2Error("pk_linkuserproject"), False),
+        (
+            _asyncpg_adapter_error("uq_linkuserproject_user_id_project_name"),
+            True,
+        ),
+        (_asyncpg_adapter_error("pk_linkuserproject"), False),
+    ],
+)
+def test_check_project_name_conflict(orig, is_conflict):
+    error = IntegrityError("INSERT ...", {}, orig)
+    if is_conflict:
+        with pytest.raises(HTTPException) as err:
+            _check_project_name_conflict(error=error, project_name="name")
+        assert err.value.status_code == 422
+        assert err.value.detail == "Project name (name) already in use"
+    else:
+        _check_project_name_conflict(error=error, project_name="name")
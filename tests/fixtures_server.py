@@ -196,7 +196,12 @@ async def db_sync(db_create_tables):
 
 @pytest.fixture
 async def app(override_settings) -> AsyncGenerator[FastAPI, Any]:
+    from fractal_server.app.compression import CompressionMiddleware
+    from fractal_server.app.db import DBStatsMiddleware
+
     app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(DBStatsMiddleware)
     yield app
 
 
@@ -261,6 +266,8 @@ async def MockCurrentUser(app, db):
     from fractal_server.app.security import current_active_verified_user
     from fractal_server.app.security import current_active_user
     from fractal_server.app.security import current_active_superuser
+    from fractal_server.app.security import current_active_user_readonly
+    from fractal_server.app.security import current_active_superuser_readonly
     from fractal_server.app.security import User
 
     def _random_email():
@@ -312,15 +319,18 @@ async def MockCurrentUser(app, db):
             # Find out which dependencies should be overridden, and store their
             # pre-override value
             if self.user.is_active:
-                self.previous_dependencies[
-                    current_active_user
-                ] = app.dependency_overrides.get(current_active_user, None)
+                for dep in (current_active_user, current_active_user_readonly):
+                    self.previous_dependencies[
+                        dep
+                    ] = app.dependency_overrides.get(dep, None)
             if self.user.is_active and self.user.is_superuser:
-                self.previous_dependencies[
-                    current_active_superuser
-                ] = app.dependency_overrides.get(
-                    current_active_superuser, None
-                )
+                for dep in (
+                    current_active_superuser,
+                    current_active_superuser_readonly,
+                ):
+                    self.previous_dependencies[
+                        dep
+                    ] = app.dependency_overrides.get(dep, None)
             if self.user.is_active and self.user.is_verified:
                 self.previous_dependencies[
                     current_active_verified_user